@@ -8,11 +8,38 @@ import subprocess
 import json
 import os
 import time
+import queue
 import logging
-from typing import Optional, Dict, List, Any
-from dataclasses import dataclass
+import itertools
+import threading
+from collections import deque, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from types import MappingProxyType
+from typing import Optional, Dict, List, Any, Callable, IO, Mapping
+from dataclasses import dataclass, replace
 from enum import Enum
 
+# Use the fastest available JSON decoder for signal-cli output
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _JSON_DECODE_ERRORS: tuple = (ValueError,)
+    JSON_BACKEND = "orjson"
+except ImportError:
+    try:
+        import msgspec
+        _json_loads = msgspec.json.decode
+        _JSON_DECODE_ERRORS = (ValueError, msgspec.DecodeError)
+        JSON_BACKEND = "msgspec"
+    except ImportError:
+        _json_loads = json.loads
+        _JSON_DECODE_ERRORS = (ValueError,)
+        JSON_BACKEND = "json"
+
+# Only lines containing this key can hold a message worth decoding; quotes inside
+# JSON string values are escaped, so the quoted key cannot appear in message text
+_DATA_MESSAGE_MARKER = '"dataMessage"'
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -25,7 +52,7 @@ class SignalMessageType(Enum):
     READ_RECEIPT = "read_receipt"
     ATTACHMENT = "attachment"
 
-@dataclass
+@dataclass(slots=True)
 class SignalMessage:
     """Signal message data structure"""
     timestamp: int
@@ -38,23 +65,617 @@ class SignalMessage:
     attachments: Optional[List[str]] = None
     message_type: SignalMessageType = SignalMessageType.TEXT
 
+
+def message_from_envelope(envelope: Dict[str, Any]) -> Optional[SignalMessage]:
+    """
+    Build a SignalMessage from a decoded signal-cli envelope
+    
+    Args:
+        envelope: The envelope data from signal-cli
+        
+    Returns:
+        SignalMessage, or None if the envelope carries no data message
+    """
+    data_msg = envelope.get('dataMessage')
+    if not data_msg:
+        return None
+    
+    text = data_msg.get('message') or ''
+    attachments = data_msg.get('attachments') or []
+    if 'reaction' in data_msg:
+        message_type = SignalMessageType.REACTION
+    elif attachments and not text:
+        message_type = SignalMessageType.ATTACHMENT
+    else:
+        message_type = SignalMessageType.TEXT
+    
+    group_info = data_msg.get('groupInfo')
+    source = envelope.get('source') or ''
+    return SignalMessage(
+        timestamp=envelope.get('timestamp', 0),
+        source=source,
+        source_number=envelope.get('sourceNumber') or source,
+        source_uuid=envelope.get('sourceUuid') or '',
+        source_name=envelope.get('sourceName') or '',
+        message=text,
+        group_id=group_info.get('groupId') if group_info else None,
+        attachments=attachments,
+        message_type=message_type
+    )
+
+
+def parse_envelope_line(line: str) -> Optional[SignalMessage]:
+    """
+    Parse one line of signal-cli JSON output into a SignalMessage
+    
+    Accepts both daemon/receive output (`{"envelope": ...}`) and JSON-RPC
+    `receive` notifications. Receipts, typing indicators and other envelopes
+    without a data message are rejected before the line is decoded.
+    
+    Args:
+        line: One line of signal-cli output
+        
+    Returns:
+        SignalMessage, or None if the line holds no data message
+    """
+    if _DATA_MESSAGE_MARKER not in line:
+        return None
+    
+    try:
+        data = _json_loads(line)
+    except _JSON_DECODE_ERRORS:
+        logger.warning(f"Failed to parse JSON: {line}")
+        return None
+    
+    if not isinstance(data, dict):
+        return None
+    envelope = data.get('envelope')
+    if envelope is None and isinstance(data.get('params'), dict):
+        envelope = data['params'].get('envelope')
+    
+    return message_from_envelope(envelope) if isinstance(envelope, dict) else None
+
+class SignalRPCError(Exception):
+    """Error returned by signal-cli over JSON-RPC, or raised when the session is unusable"""
+    
+    def __init__(self, message: str, code: Optional[int] = None, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.data = data
+
+
+def _drain_stream(stream: IO[str], name: str, tail: Optional[deque] = None):
+    """Read a process stream to EOF, logging each line so the pipe never fills"""
+    try:
+        for line in iter(stream.readline, ''):
+            line = line.rstrip()
+            if line:
+                logger.debug(f"[{name}] {line}")
+                if tail is not None:
+                    tail.append(line)
+    except (OSError, ValueError):
+        # Stream closed underneath us during shutdown
+        pass
+
+
+class SignalJsonRpcSession:
+    """
+    Persistent signal-cli JSON-RPC session
+    Keeps one `signal-cli jsonRpc` process alive and multiplexes requests over
+    its stdin/stdout by request id, so each call avoids a JVM startup.
+    
+    The process runs with `--receive-mode=manual`, so signal-cli only pushes
+    incoming messages as `receive` notifications after a `subscribeReceive`
+    request; until then they stay queued on the Signal server.
+    """
+    
+    def __init__(
+        self,
+        phone_number: str,
+        signal_cli_path: str = "signal-cli",
+        request_timeout: float = 30.0,
+        on_notification: Optional[Callable[[Dict[str, Any]], None]] = None,
+        stderr_tail: Optional[deque] = None
+    ):
+        """
+        Initialize JSON-RPC session
+        
+        Args:
+            phone_number: The phone number for the Signal account (with country code)
+            signal_cli_path: Path to signal-cli executable
+            request_timeout: Default seconds to wait for a response
+            on_notification: Callback for server notifications (e.g. received messages),
+                called on the reader thread; notifications are dropped when not set
+            stderr_tail: Optional deque that keeps the last lines signal-cli wrote to stderr
+        """
+        self.phone_number = phone_number
+        self.signal_cli_path = signal_cli_path
+        self.request_timeout = request_timeout
+        self.on_notification = on_notification
+        self.stderr_tail = stderr_tail
+        self.process: Optional[subprocess.Popen] = None
+        self._ids = itertools.count(1)
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._reader: Optional[threading.Thread] = None
+    
+    @property
+    def is_running(self) -> bool:
+        """True while the signal-cli process is alive"""
+        return self.process is not None and self.process.poll() is None
+    
+    @property
+    def is_reading(self) -> bool:
+        """True until the reader has consumed all output of the current process"""
+        return self._reader is not None and self._reader.is_alive()
+    
+    def start(self) -> bool:
+        """
+        Start the signal-cli JSON-RPC process
+        
+        Returns:
+            bool: True if the session is running
+        """
+        with self._start_lock:
+            if self.is_running:
+                return True
+            
+            process = self.spawn()
+            if not process:
+                return False
+            self.attach(process)
+        
+        logger.info("Signal CLI JSON-RPC session started")
+        return True
+    
+    def spawn(self) -> Optional[subprocess.Popen]:
+        """
+        Launch a signal-cli JSON-RPC process without making it the session's process
+        
+        Its stderr is drained right away, so a process that is kept in reserve
+        (e.g. waiting on the account lock) never blocks on a full pipe.
+        
+        Returns:
+            The process, or None if it could not be started
+        """
+        try:
+            cmd = [self.signal_cli_path, "-a", self.phone_number, "jsonRpc", "--receive-mode=manual"]
+            process = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                bufsize=1
+            )
+        except Exception as e:
+            logger.error(f"Failed to start JSON-RPC session: {e}")
+            return None
+        
+        threading.Thread(
+            target=_drain_stream,
+            args=(process.stderr, "signal-cli", self.stderr_tail),
+            name="signal-jsonrpc-stderr",
+            daemon=True
+        ).start()
+        return process
+    
+    def attach(self, process: subprocess.Popen):
+        """
+        Make process the session's signal-cli process and start reading its output
+        
+        A previous process that is still alive is terminated, so only one
+        process ever holds the account.
+        """
+        previous, self.process = self.process, process
+        if previous is not None and previous is not process and previous.poll() is None:
+            previous.terminate()
+        
+        self._reader = threading.Thread(
+            target=self._read_responses, args=(process,), name="signal-jsonrpc-reader", daemon=True
+        )
+        self._reader.start()
+    
+    def stop(self):
+        """Stop the signal-cli JSON-RPC process and fail any pending requests"""
+        process = self.process
+        if not process:
+            return
+        
+        self.process = None
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.terminate()
+            process.wait()
+        
+        if self._reader:
+            self._reader.join(timeout=5)
+            self._reader = None
+        self._fail_pending(SignalRPCError("JSON-RPC session stopped"))
+        logger.info("Signal CLI JSON-RPC session stopped")
+    
+    def submit(self, method: str, params: Optional[Dict[str, Any]] = None) -> Future:
+        """
+        Send a request without waiting for the response
+        
+        Args:
+            method: JSON-RPC method name (e.g. 'send', 'listGroups')
+            params: Method parameters
+            
+        Returns:
+            Future resolved with the response result, or failed with SignalRPCError
+        """
+        future: Future = Future()
+        process = self.process
+        if not self.is_running:
+            future.set_exception(SignalRPCError("JSON-RPC session is not running"))
+            return future
+        
+        request_id = str(next(self._ids))
+        request = {"jsonrpc": "2.0", "method": method, "id": request_id}
+        if params:
+            request["params"] = params
+        
+        with self._lock:
+            self._pending[request_id] = future
+            try:
+                process.stdin.write(json.dumps(request) + "\n")
+                process.stdin.flush()
+            except (OSError, ValueError) as e:
+                self._pending.pop(request_id, None)
+                future.set_exception(SignalRPCError(f"Failed to write request: {e}"))
+        
+        return future
+    
+    def request(self, method: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Any:
+        """
+        Send a request and wait for its result
+        
+        Args:
+            method: JSON-RPC method name
+            params: Method parameters
+            timeout: Seconds to wait, defaults to request_timeout
+            
+        Returns:
+            The response result
+            
+        Raises:
+            SignalRPCError: If signal-cli returned an error or no response arrived in time
+        """
+        future = self.submit(method, params)
+        try:
+            return future.result(timeout=timeout if timeout is not None else self.request_timeout)
+        except FutureTimeoutError:
+            self.discard(future)
+            raise SignalRPCError(f"Timed out waiting for {method} response")
+    
+    def discard(self, future: Future):
+        """Stop tracking a request whose response is no longer awaited"""
+        with self._lock:
+            for request_id, pending in list(self._pending.items()):
+                if pending is future:
+                    del self._pending[request_id]
+    
+    def _read_responses(self, process: subprocess.Popen):
+        """Reader thread: resolve pending futures by id and route notifications"""
+        try:
+            for line in iter(process.stdout.readline, ''):
+                line = line.strip()
+                if not line:
+                    continue
+                if '"id"' not in line and _DATA_MESSAGE_MARKER not in line:
+                    # Notification without a data message (receipt, typing, sync)
+                    continue
+                try:
+                    data = _json_loads(line)
+                except _JSON_DECODE_ERRORS:
+                    logger.warning(f"Failed to parse JSON: {line}")
+                    continue
+                self._dispatch(data)
+        except (OSError, ValueError):
+            pass
+        finally:
+            # Requests already sent to a replacement process must not fail with this one
+            if process is self.process or self.process is None:
+                self._fail_pending(SignalRPCError("signal-cli JSON-RPC process exited"))
+    
+    def _dispatch(self, data: Dict[str, Any]):
+        """Route one decoded JSON-RPC message"""
+        request_id = data.get('id')
+        if request_id is not None and 'method' not in data:
+            with self._lock:
+                future = self._pending.pop(str(request_id), None)
+            if future is None:
+                logger.warning(f"Response for unknown request id {request_id}")
+            elif 'error' in data:
+                error = data['error'] or {}
+                future.set_exception(SignalRPCError(
+                    error.get('message', 'Unknown JSON-RPC error'), error.get('code'), error.get('data')
+                ))
+            else:
+                future.set_result(data.get('result'))
+            return
+        
+        if self.on_notification:
+            try:
+                self.on_notification(data)
+            except Exception as e:
+                logger.error(f"Notification handler error: {e}")
+        else:
+            logger.debug(f"Dropped {data.get('method')} notification")
+    
+    def _fail_pending(self, error: Exception):
+        """Fail every outstanding request"""
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for future in pending:
+            if not future.done():
+                future.set_exception(error)
+
+
+@dataclass
+class DeliveryResult:
+    """Delivery outcome for one broadcast recipient or group"""
+    recipient: str
+    success: bool
+    error: Optional[str] = None
+
+
+class RateLimiter:
+    """
+    Token bucket limiting how many recipients per second are sent to
+    Acquiring more tokens than are available waits until the bucket refills.
+    """
+    
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """
+        Initialize rate limiter
+        
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity, defaults to one second's worth of tokens
+        """
+        self.rate = rate
+        self.capacity = burst if burst is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, tokens: float = 1):
+        """Take tokens from the bucket, sleeping until they are available"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+    
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take tokens only if they are available right now"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            return True
+
+
+class KeyedRateLimiter:
+    """
+    Independent token buckets per key (e.g. per sender)
+    The least recently used buckets are dropped beyond max_keys.
+    """
+    
+    def __init__(self, rate: float, burst: Optional[float] = None, max_keys: int = 10000):
+        """
+        Initialize keyed rate limiter
+        
+        Args:
+            rate: Tokens added per second to each bucket
+            burst: Bucket capacity, defaults to one second's worth of tokens
+            max_keys: Maximum number of tracked keys
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, RateLimiter]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def allow(self, key: str) -> bool:
+        """True if the key may proceed now"""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = RateLimiter(self.rate, self.burst)
+                while len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+        return bucket.try_acquire()
+
+
+class IdentityCache:
+    """
+    TTL and LRU cache of Signal user status lookups, keyed by phone number
+    Numbers that are not registered with Signal are cached too, with a shorter TTL.
+    """
+    
+    def __init__(self, ttl: float = 300.0, negative_ttl: float = 60.0, max_size: int = 10000):
+        """
+        Initialize identity cache
+        
+        Args:
+            ttl: Seconds a registered user's status stays valid
+            negative_ttl: Seconds an unregistered or unknown number stays valid
+            max_size: Maximum number of cached numbers before least recently used are evicted
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, phone_number: str) -> tuple:
+        """
+        Look up a cached status
+        
+        Returns:
+            (hit, status) where status is None for a cached negative result
+        """
+        with self._lock:
+            entry = self._entries.get(phone_number)
+            if entry is None:
+                return False, None
+            
+            expires_at, status = entry
+            if expires_at <= time.monotonic():
+                del self._entries[phone_number]
+                return False, None
+            
+            self._entries.move_to_end(phone_number)
+            return True, status
+    
+    def set(self, phone_number: str, status: Optional[Dict[str, Any]]):
+        """Cache a status; None or an unregistered status is cached as negative"""
+        registered = bool(status and status.get('isRegistered', True))
+        expires_at = time.monotonic() + (self.ttl if registered else self.negative_ttl)
+        
+        with self._lock:
+            self._entries[phone_number] = (expires_at, status)
+            self._entries.move_to_end(phone_number)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, phone_number: Optional[str] = None):
+        """Drop one number, or every entry when no number is given"""
+        with self._lock:
+            if phone_number is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(phone_number, None)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class UserIdentityStore:
+    """
+    Persists resolved Signal UUIDs to the `signal_identity` column of `users`
+    
+    Uses any DB-API connection with the 'format' paramstyle (e.g. psycopg2).
+    Users whose signal_identity still holds the phone number are upgraded to
+    the UUID, matching what the dashboard stores after verification.
+    """
+    
+    def __init__(self, connection):
+        """
+        Initialize identity store
+        
+        Args:
+            connection: Open DB-API connection to the dashboard database
+        """
+        self.connection = connection
+    
+    def persist(self, phone_number: str, uuid: str):
+        """Record the UUID for users identified by this phone number"""
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(
+                    "UPDATE users SET signal_identity = %s WHERE signal_identity = %s",
+                    (uuid, phone_number)
+                )
+            self.connection.commit()
+        except Exception as e:
+            logger.error(f"Failed to persist Signal identity for {phone_number}: {e}")
+            self.connection.rollback()
+
+
 class SignalCLI:
     """
     Signal CLI wrapper for Python
     Provides methods for sending and receiving Signal messages
     """
     
-    def __init__(self, phone_number: str, signal_cli_path: str = "signal-cli"):
+    def __init__(
+        self,
+        phone_number: str,
+        signal_cli_path: str = "signal-cli",
+        use_json_rpc: bool = False,
+        daemon_queue_size: int = 1000,
+        identity_cache: Optional[IdentityCache] = None,
+        identity_store: Optional[UserIdentityStore] = None
+    ):
         """
         Initialize Signal CLI wrapper
         
         Args:
             phone_number: The phone number for the Signal account (with country code)
             signal_cli_path: Path to signal-cli executable
+            use_json_rpc: Route commands and message receiving through one persistent
+                `signal-cli jsonRpc` process instead of spawning signal-cli per command
+            daemon_queue_size: Maximum number of decoded incoming messages buffered
+                before the reader stops consuming signal-cli output
+            identity_cache: Cache for get_user_status lookups, a default one is created if not given
+            identity_store: Optional store that persists resolved UUIDs to the users table
         """
         self.phone_number = phone_number
         self.signal_cli_path = signal_cli_path
         self.daemon_process = None
+        self.daemon_queue_size = daemon_queue_size
+        self._daemon_messages: Optional["queue.Queue[SignalMessage]"] = None
+        self._daemon_reader: Optional[threading.Thread] = None
+        self._daemon_stopping = threading.Event()
+        self._daemon_eof = threading.Event()
+        self.daemon_stderr_tail: deque = deque(maxlen=50)
+        self.identity_cache = identity_cache or IdentityCache()
+        self.identity_store = identity_store
+        self.rpc_session: Optional[SignalJsonRpcSession] = None
+        self._subscription: Any = None
+        
+        if use_json_rpc:
+            self.rpc_session = self._new_session()
+    
+    def _new_session(self) -> SignalJsonRpcSession:
+        """Create a JSON-RPC session that feeds received messages into the message queue"""
+        return SignalJsonRpcSession(
+            self.phone_number,
+            self.signal_cli_path,
+            on_notification=self._on_notification,
+            stderr_tail=self.daemon_stderr_tail
+        )
+    
+    def start_session(self) -> bool:
+        """
+        Start the persistent JSON-RPC session, enabling it if needed
+        
+        Returns:
+            bool: True if the session is running
+        """
+        if not self.rpc_session:
+            self.rpc_session = self._new_session()
+        return self.rpc_session.start()
+    
+    def stop_session(self):
+        """Stop the persistent JSON-RPC session"""
+        if self.rpc_session:
+            self.rpc_session.stop()
+    
+    def _rpc(self, method: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Run a JSON-RPC request, starting the session on first use"""
+        if not self.rpc_session.is_running and not self.rpc_session.start():
+            raise SignalRPCError("JSON-RPC session could not be started")
+        return self.rpc_session.request(method, params)
         
     def register(self) -> bool:
         """
@@ -117,6 +738,14 @@ class SignalCLI:
             bool: True if message sent successfully
         """
         try:
+            if self.rpc_session:
+                params = {"recipient": [recipient], "message": message}
+                if attachments:
+                    params["attachments"] = attachments
+                self._rpc("send", params)
+                logger.info(f"Message sent to {recipient}")
+                return True
+            
             cmd = [self.signal_cli_path, "-a", self.phone_number, "send", "-m", message]
             
             if attachments:
@@ -151,6 +780,14 @@ class SignalCLI:
             bool: True if message sent successfully
         """
         try:
+            if self.rpc_session:
+                params = {"groupId": group_id, "message": message}
+                if attachments:
+                    params["attachments"] = attachments
+                self._rpc("send", params)
+                logger.info(f"Message sent to group {group_id}")
+                return True
+            
             cmd = [self.signal_cli_path, "-a", self.phone_number, "send", "-m", message]
             
             if attachments:
@@ -172,6 +809,134 @@ class SignalCLI:
             logger.error(f"Send group message error: {e}")
             return False
     
+    def broadcast(
+        self,
+        message: str,
+        recipients: Optional[List[str]] = None,
+        group_ids: Optional[List[str]] = None,
+        attachments: Optional[List[str]] = None,
+        batch_size: int = 50,
+        rate_limiter: Optional[RateLimiter] = None
+    ) -> Dict[str, DeliveryResult]:
+        """
+        Send one message to many recipients and groups
+        
+        Direct recipients are grouped into multi-recipient sends of up to
+        batch_size, so message encryption setup and attachment uploads happen
+        once per batch rather than once per recipient. Each group is one send.
+        With a JSON-RPC session, batches are issued concurrently over it.
+        
+        Args:
+            message: Text message to send
+            recipients: Phone numbers or Signal UUIDs
+            group_ids: Group IDs
+            attachments: Optional list of file paths to attach
+            batch_size: Maximum recipients per send
+            rate_limiter: Limits recipients sent per second; defaults to 10/s
+            
+        Returns:
+            Dict mapping each recipient and group ID to its DeliveryResult
+        """
+        limiter = rate_limiter or RateLimiter(rate=10.0, burst=batch_size)
+        unique_recipients = list(dict.fromkeys(recipients or []))
+        sends = [
+            ("recipient", unique_recipients[i:i + batch_size])
+            for i in range(0, len(unique_recipients), batch_size)
+        ]
+        sends.extend(("group", [group_id]) for group_id in dict.fromkeys(group_ids or []))
+        
+        results: Dict[str, DeliveryResult] = {}
+        pending = []
+        
+        for kind, targets in sends:
+            limiter.acquire(len(targets))
+            if self.rpc_session:
+                params: Dict[str, Any] = {"message": message}
+                if kind == "group":
+                    params["groupId"] = targets[0]
+                else:
+                    params["recipient"] = targets
+                if attachments:
+                    params["attachments"] = attachments
+                if not self.rpc_session.is_running:
+                    self.rpc_session.start()
+                pending.append((kind, targets, self.rpc_session.submit("send", params)))
+            else:
+                results.update(self._broadcast_subprocess(kind, targets, message, attachments))
+        
+        for kind, targets, future in pending:
+            try:
+                response = future.result(timeout=self.rpc_session.request_timeout)
+                if kind == "group":
+                    # Per-member results for a group send do not fail the group itself
+                    results[targets[0]] = DeliveryResult(targets[0], True)
+                else:
+                    results.update(self._delivery_results(targets, response))
+            except (SignalRPCError, FutureTimeoutError) as e:
+                error = str(e) or "Timed out waiting for send response"
+                results.update({target: DeliveryResult(target, False, error) for target in targets})
+        
+        delivered = sum(1 for result in results.values() if result.success)
+        logger.info(f"Broadcast delivered to {delivered}/{len(results)} recipients and groups")
+        return results
+    
+    def _broadcast_subprocess(
+        self, kind: str, targets: List[str], message: str, attachments: Optional[List[str]]
+    ) -> Dict[str, DeliveryResult]:
+        """Send one broadcast batch with a signal-cli subprocess, reading per-recipient results from its JSON output"""
+        cmd = [self.signal_cli_path, "-a", self.phone_number, "-o", "json", "send", "-m", message]
+        
+        if attachments:
+            for attachment in attachments:
+                cmd.extend(["-a", attachment])
+        
+        if kind == "group":
+            cmd.extend(["-g", targets[0]])
+        else:
+            cmd.extend(targets)
+        
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True)
+        except Exception as e:
+            logger.error(f"Failed to send broadcast batch: {e}")
+            return {target: DeliveryResult(target, False, str(e)) for target in targets}
+        
+        try:
+            response = json.loads(result.stdout) if result.stdout.strip() else None
+        except ValueError:
+            response = None
+        
+        if isinstance(response, dict) and (kind == "group" or response.get("results")):
+            # signal-cli exits non-zero when any recipient failed, so trust the per-recipient results
+            if kind == "group":
+                return {targets[0]: DeliveryResult(targets[0], True)}
+            return self._delivery_results(targets, response)
+        
+        if result.returncode == 0:
+            return {target: DeliveryResult(target, True) for target in targets}
+        
+        error = result.stderr.strip() or "signal-cli send failed"
+        logger.error(f"Failed to send broadcast batch: {error}")
+        return {target: DeliveryResult(target, False, error) for target in targets}
+    
+    @staticmethod
+    def _delivery_results(targets: List[str], response: Any) -> Dict[str, DeliveryResult]:
+        """Map a signal-cli send response (JSON-RPC or `-o json` output) onto per-recipient results"""
+        results = {target: DeliveryResult(target, True) for target in targets}
+        send_results = response.get("results") if isinstance(response, dict) else None
+        
+        for send_result in send_results or []:
+            address = send_result.get("recipientAddress") or {}
+            target = next(
+                (t for t in (address.get("number"), address.get("uuid")) if t in results),
+                targets[0] if len(targets) == 1 else None
+            )
+            status = send_result.get("type", "SUCCESS")
+            if target and status != "SUCCESS":
+                results[target] = DeliveryResult(target, False, status)
+        
+        return results
+    
     def receive_messages(self, timeout: int = 10) -> List[SignalMessage]:
         """
         Receive messages (one-time check)
@@ -184,121 +949,329 @@ class SignalCLI:
         """
         messages = []
         
+        if self.rpc_session:
+            return self._receive_session_messages(timeout)
+        
         try:
             cmd = [self.signal_cli_path, "-a", self.phone_number, "receive", "--json", "-t", str(timeout)]
             result = subprocess.run(cmd, capture_output=True, text=True)
             
             if result.returncode == 0 and result.stdout:
-                lines = result.stdout.strip().split('\n')
-                
-                for line in lines:
-                    if line:
-                        try:
-                            data = json.loads(line)
-                            if 'envelope' in data:
-                                envelope = data['envelope']
-                                if 'dataMessage' in envelope:
-                                    msg = self._parse_message(envelope)
-                                    if msg:
-                                        messages.append(msg)
-                        except json.JSONDecodeError:
-                            logger.warning(f"Failed to parse JSON: {line}")
+                for line in result.stdout.splitlines():
+                    msg = parse_envelope_line(line)
+                    if msg:
+                        messages.append(msg)
                             
         except Exception as e:
             logger.error(f"Receive messages error: {e}")
             
         return messages
     
+    def _receive_session_messages(self, timeout: int) -> List[SignalMessage]:
+        """Subscribe the JSON-RPC session to incoming messages for one receive window"""
+        if self.daemon_running:
+            # Continuous receiving is already on; just drain the shared queue
+            return self.read_daemon_messages(timeout=timeout)
+        
+        if not self.start_daemon():
+            logger.error("JSON-RPC session could not be started")
+            return []
+        try:
+            return self.read_daemon_messages(timeout=timeout)
+        finally:
+            self.stop_daemon()
+    
     def start_daemon(self) -> bool:
         """
-        Start signal-cli in daemon mode for continuous message receiving
+        Start continuous message receiving
+        
+        Runs signal-cli in daemon mode, with a reader thread that decodes stdout
+        as it arrives into a bounded queue; stderr is drained to the log so
+        neither pipe can fill up. With a JSON-RPC session, the session's process
+        is subscribed to incoming messages instead: signal-cli locks the
+        account, so a separate daemon would block every request on the session.
         
         Returns:
             bool: True if daemon started successfully
         """
+        if self.rpc_session:
+            if not self.rpc_session.start():
+                return False
+            process = self.rpc_session.process
+        else:
+            process = self._spawn_daemon()
+            if not process:
+                return False
+        
+        self._attach_daemon(process)
+        logger.info("Signal CLI daemon started")
+        return True
+    
+    def _spawn_daemon(self) -> Optional[subprocess.Popen]:
+        """Launch a daemon (or JSON-RPC) process and start draining its stderr"""
+        if self.rpc_session:
+            return self.rpc_session.spawn()
+        
         try:
             cmd = [self.signal_cli_path, "-a", self.phone_number, "daemon", "--json"]
-            self.daemon_process = subprocess.Popen(
+            process = subprocess.Popen(
                 cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True
+                text=True,
+                bufsize=1
             )
-            
-            logger.info("Signal CLI daemon started")
-            return True
-            
         except Exception as e:
             logger.error(f"Failed to start daemon: {e}")
-            return False
+            return None
+        
+        threading.Thread(
+            target=_drain_stream,
+            args=(process.stderr, "signal-cli daemon", self.daemon_stderr_tail),
+            name="signal-daemon-stderr",
+            daemon=True
+        ).start()
+        return process
+    
+    def _attach_daemon(self, process: subprocess.Popen):
+        """Make process the active daemon and start reading its output"""
+        self.daemon_process = process
+        self._daemon_stopping.clear()
+        self._daemon_eof.clear()
+        if self._daemon_messages is None:
+            # Kept across restarts so the bot never waits on a stale queue
+            self._daemon_messages = queue.Queue(maxsize=self.daemon_queue_size)
+        
+        if self.rpc_session:
+            if process is not self.rpc_session.process:
+                self.rpc_session.attach(process)
+            # A standby process only reads this once it holds the account lock
+            self.rpc_session.submit("subscribeReceive").add_done_callback(self._on_subscribed)
+            return
+        
+        self._daemon_reader = threading.Thread(
+            target=self._read_daemon_stream,
+            args=(process, self._daemon_messages),
+            name="signal-daemon-reader",
+            daemon=True
+        )
+        self._daemon_reader.start()
+    
+    def _on_subscribed(self, future: Future):
+        """Remember the subscription id returned by subscribeReceive"""
+        try:
+            self._subscription = future.result()
+        except SignalRPCError as e:
+            logger.error(f"Failed to subscribe to incoming messages: {e}")
     
     def stop_daemon(self):
-        """Stop the signal-cli daemon"""
-        if self.daemon_process:
-            self.daemon_process.terminate()
-            self.daemon_process.wait()
-            self.daemon_process = None
-            logger.info("Signal CLI daemon stopped")
+        """Stop the signal-cli daemon, or unsubscribe the JSON-RPC session from incoming messages"""
+        process = self.daemon_process
+        if not process:
+            return
+        
+        self._daemon_stopping.set()
+        self.daemon_process = None
+        if self.rpc_session:
+            subscription, self._subscription = self._subscription, None
+            if subscription is not None and self.rpc_session.is_running:
+                try:
+                    self.rpc_session.request("unsubscribeReceive", {"subscription": subscription}, timeout=5)
+                except SignalRPCError as e:
+                    logger.warning(f"Failed to unsubscribe from incoming messages: {e}")
+            # Messages that arrived meanwhile stay queued for the next receive
+            logger.info("Signal CLI JSON-RPC receiving stopped")
+            return
+        
+        process.terminate()
+        process.wait()
+        if self._daemon_reader:
+            self._daemon_reader.join(timeout=5)
+            self._daemon_reader = None
+        self._daemon_messages = None
+        logger.info("Signal CLI daemon stopped")
+    
+    @property
+    def daemon_running(self) -> bool:
+        """True while the daemon process is alive or still has unread output"""
+        if self.daemon_process is None:
+            return False
+        if self.rpc_session:
+            return self.rpc_session.process is self.daemon_process and self.rpc_session.is_reading
+        return not self._daemon_eof.is_set()
+    
+    def _on_notification(self, notification: Dict[str, Any]):
+        """JSON-RPC reader callback: queue messages pushed as 'receive' notifications"""
+        if notification.get('method') != 'receive':
+            return
+        
+        params = notification.get('params') or {}
+        # Notifications for a subscribeReceive subscription wrap the envelope in 'result'
+        envelope = params.get('envelope') or (params.get('result') or {}).get('envelope')
+        msg = message_from_envelope(envelope) if isinstance(envelope, dict) else None
+        messages = self._daemon_messages
+        if msg and messages is not None:
+            self._enqueue_message(messages, msg)
+    
+    def _enqueue_message(self, messages: "queue.Queue[SignalMessage]", msg: SignalMessage):
+        """
+        Put a decoded message on the bounded queue
+        
+        While the queue is full the calling reader waits, so backpressure reaches
+        signal-cli through the pipe instead of buffering without bound. Once
+        receiving is stopped, a message that does not fit is dropped.
+        """
+        while True:
+            try:
+                messages.put(msg, timeout=0.5)
+                return
+            except queue.Full:
+                if self._daemon_stopping.is_set():
+                    logger.warning("Message queue full after receiving stopped, dropping message")
+                    return
+                logger.warning("Message queue full, pausing reader")
+    
+    def _read_daemon_stream(self, process: subprocess.Popen, messages: "queue.Queue[SignalMessage]"):
+        """Reader thread: decode daemon stdout line by line into the message queue"""
+        try:
+            for line in iter(process.stdout.readline, ''):
+                msg = parse_envelope_line(line)
+                if msg:
+                    self._enqueue_message(messages, msg)
+                
+        except (OSError, ValueError) as e:
+            if not self._daemon_stopping.is_set():
+                logger.error(f"Read daemon messages error: {e}")
+        finally:
+            # A replaced daemon's reader must not mark its successor as ended
+            if process is self.daemon_process:
+                self._daemon_eof.set()
+                if not self._daemon_stopping.is_set():
+                    logger.error("Signal CLI daemon output ended")
+    
+    def next_daemon_message(self, timeout: Optional[float] = None) -> Optional[SignalMessage]:
+        """
+        Wait for the next message from the running daemon
+        
+        Args:
+            timeout: Seconds to wait, or None to wait until a message arrives
+            
+        Returns:
+            SignalMessage, or None if nothing arrived in time
+        """
+        if not self._daemon_messages:
+            logger.error("Daemon not running")
+            return None
+        
+        try:
+            return self._daemon_messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
     
-    def read_daemon_messages(self) -> List[SignalMessage]:
+    def read_daemon_messages(self, timeout: float = 0) -> List[SignalMessage]:
         """
         Read messages from the running daemon
         
+        Args:
+            timeout: Seconds to wait for the first message; 0 returns immediately
+            
         Returns:
-            List of SignalMessage objects
+            List of SignalMessage objects already received
         """
         messages = []
         
-        if not self.daemon_process:
+        if not self._daemon_messages:
             logger.error("Daemon not running")
             return messages
         
         try:
-            # Non-blocking read from stdout
+            messages.append(self._daemon_messages.get(timeout=timeout) if timeout > 0
+                            else self._daemon_messages.get_nowait())
             while True:
-                line = self.daemon_process.stdout.readline()
-                if not line:
-                    break
-                    
-                try:
-                    data = json.loads(line)
-                    if 'envelope' in data:
-                        envelope = data['envelope']
-                        if 'dataMessage' in envelope:
-                            msg = self._parse_message(envelope)
-                            if msg:
-                                messages.append(msg)
-                except json.JSONDecodeError:
-                    logger.warning(f"Failed to parse JSON: {line}")
-                    
-        except Exception as e:
-            logger.error(f"Read daemon messages error: {e}")
-            
+                messages.append(self._daemon_messages.get_nowait())
+        except queue.Empty:
+            pass
+        
         return messages
     
-    def get_user_status(self, phone_number: str) -> Optional[Dict[str, Any]]:
+    def get_user_status(self, phone_number: str, use_cache: bool = True) -> Optional[Dict[str, Any]]:
         """
         Get Signal user status and UUID
         
         Args:
             phone_number: Phone number to check
+            use_cache: Serve from the identity cache when a fresh entry exists
             
         Returns:
             Dict with user status or None
         """
-        try:
-            cmd = [self.signal_cli_path, "-a", self.phone_number, "getUserStatus", phone_number, "--json"]
-            result = subprocess.run(cmd, capture_output=True, text=True)
+        return self.get_user_statuses([phone_number], use_cache=use_cache).get(phone_number)
+    
+    def get_user_statuses(self, phone_numbers: List[str], use_cache: bool = True) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Get Signal user status for many numbers, looking up cache misses in one call
+        
+        Args:
+            phone_numbers: Phone numbers to check
+            use_cache: Serve from the identity cache when a fresh entry exists
             
-            if result.returncode == 0 and result.stdout:
-                return json.loads(result.stdout)
+        Returns:
+            Dict mapping each phone number to its status, or None if unknown
+        """
+        statuses: Dict[str, Optional[Dict[str, Any]]] = {}
+        misses = []
+        
+        for number in dict.fromkeys(phone_numbers):
+            hit, status = self.identity_cache.get(number) if use_cache else (False, None)
+            if hit:
+                statuses[number] = status
             else:
-                logger.error(f"Failed to get user status: {result.stderr}")
-                return None
+                misses.append(number)
+        
+        if not misses:
+            return statuses
+        
+        fetched = self._fetch_user_statuses(misses)
+        if fetched is None:
+            # Lookup failed; report unknown without caching the failure
+            statuses.update({number: None for number in misses})
+            return statuses
+        
+        for number in misses:
+            status = fetched.get(number)
+            self.identity_cache.set(number, status)
+            statuses[number] = status
+            if self.identity_store and status and status.get('isRegistered') and status.get('uuid'):
+                self.identity_store.persist(number, status['uuid'])
+        
+        return statuses
+    
+    def _fetch_user_statuses(self, phone_numbers: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Run one getUserStatus call for several numbers; None if the call failed"""
+        try:
+            if self.rpc_session:
+                data = self._rpc("getUserStatus", {"recipient": phone_numbers})
+            else:
+                cmd = [self.signal_cli_path, "-a", self.phone_number, "getUserStatus", *phone_numbers, "--json"]
+                result = subprocess.run(cmd, capture_output=True, text=True)
+                
+                if result.returncode != 0 or not result.stdout:
+                    logger.error(f"Failed to get user status: {result.stderr}")
+                    return None
+                data = json.loads(result.stdout)
                 
         except Exception as e:
             logger.error(f"Get user status error: {e}")
             return None
+        
+        statuses = {}
+        for status in data if isinstance(data, list) else [data]:
+            if isinstance(status, dict):
+                # 'recipient' echoes the caller's input; 'number' is normalized to E.164
+                for key in (status.get('recipient'), status.get('number')):
+                    if key:
+                        statuses.setdefault(key, status)
+        return statuses
     
     def list_groups(self) -> List[Dict[str, Any]]:
         """
@@ -310,6 +1283,10 @@ class SignalCLI:
         groups = []
         
         try:
+            if self.rpc_session:
+                data = self._rpc("listGroups")
+                return data if isinstance(data, list) else groups
+            
             cmd = [self.signal_cli_path, "-a", self.phone_number, "listGroups", "--json"]
             result = subprocess.run(cmd, capture_output=True, text=True)
             
@@ -322,34 +1299,686 @@ class SignalCLI:
             logger.error(f"List groups error: {e}")
             
         return groups
+
+
+@dataclass
+class SupervisorStats:
+    """Restart and downtime metrics for a supervised daemon"""
+    restarts: int = 0
+    failovers: int = 0
+    start_failures: int = 0
+    standby_failures: int = 0
+    health_check_failures: int = 0
+    total_downtime_seconds: float = 0.0
+    last_exit_code: Optional[int] = None
+    last_failure_at: Optional[float] = None
+
+
+class DaemonSupervisor:
+    """
+    Keeps the signal-cli daemon of a SignalCLI instance running
     
-    def _parse_message(self, envelope: Dict[str, Any]) -> Optional[SignalMessage]:
+    Waits on the daemon process and restarts it with exponential backoff when
+    it exits, logging the tail of its stderr. With warm_standby, a second
+    daemon is kept started: signal-cli locks the account's data directory, so
+    the standby JVM waits on that lock and takes over as soon as the primary
+    dies, without paying JVM startup on failover. A standby that exits on its
+    own is replaced with the same backoff as restarts. Messages already
+    decoded stay on the shared queue across restarts.
+    
+    With a JSON-RPC session, a lightweight `version` request is sent every
+    health_interval; a daemon that leaves max_health_failures probes in a row
+    unanswered is treated as hung and killed, which triggers the usual restart.
+    A plain `daemon --json` process has no request channel, so only its exit
+    is detected.
+    """
+    
+    def __init__(
+        self,
+        signal: SignalCLI,
+        initial_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        stable_after: float = 60.0,
+        warm_standby: bool = False,
+        check_interval: float = 1.0,
+        health_interval: float = 30.0,
+        health_timeout: float = 10.0,
+        max_health_failures: int = 3
+    ):
         """
-        Parse an envelope into a SignalMessage
+        Initialize daemon supervisor
         
         Args:
-            envelope: The envelope data from signal-cli
-            
+            signal: SignalCLI whose daemon is supervised
+            initial_backoff: Seconds to wait before restarting a daemon that crashed soon after starting
+            max_backoff: Upper bound for the restart delay
+            stable_after: Seconds of uptime after which a crash restarts immediately and resets the backoff
+            warm_standby: Keep a second daemon started for fast failover
+            check_interval: Seconds between checks that the daemon and standby processes are alive
+            health_interval: Seconds between health probes over the JSON-RPC session, 0 to disable
+            health_timeout: Seconds a health probe may go unanswered before it counts as failed
+            max_health_failures: Consecutive failed probes after which the daemon is restarted
+        """
+        self.signal = signal
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+        self.warm_standby = warm_standby
+        self.check_interval = check_interval
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.max_health_failures = max_health_failures
+        self._health_probe: Optional[Future] = None
+        self._health_sent_at = 0.0
+        self._health_failures = 0
+        self._stats = SupervisorStats()
+        self._stats_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._standby: Optional[subprocess.Popen] = None
+        self._standby_started_at = 0.0
+        self._standby_backoff = initial_backoff
+        self._standby_retry_at = 0.0
+        self._started_at = 0.0
+    
+    @property
+    def running(self) -> bool:
+        """True while the supervisor is watching the daemon"""
+        return self._thread is not None and self._thread.is_alive() and not self._stopping.is_set()
+    
+    def metrics(self) -> SupervisorStats:
+        """Snapshot of restart and downtime metrics"""
+        with self._stats_lock:
+            return replace(self._stats)
+    
+    def start(self) -> bool:
+        """
+        Start the daemon and begin supervising it
+        
         Returns:
-            SignalMessage object or None
+            bool: True if the daemon started
         """
-        try:
-            data_msg = envelope.get('dataMessage', {})
-            
-            return SignalMessage(
-                timestamp=envelope.get('timestamp', 0),
-                source=envelope.get('source', ''),
-                source_number=envelope.get('sourceNumber', envelope.get('source', '')),
-                source_uuid=envelope.get('sourceUuid', ''),
-                source_name=envelope.get('sourceName', ''),
-                message=data_msg.get('message', ''),
-                group_id=data_msg.get('groupInfo', {}).get('groupId'),
-                attachments=data_msg.get('attachments', [])
+        self._stopping.clear()
+        if not self.signal.daemon_running and not self.signal.start_daemon():
+            return False
+        
+        self._started_at = time.monotonic()
+        self._reset_health()
+        if self.warm_standby:
+            self._spawn_standby()
+        
+        self._thread = threading.Thread(target=self._monitor, name="signal-daemon-supervisor", daemon=True)
+        self._thread.start()
+        logger.info(f"Signal CLI daemon supervisor started{' with warm standby' if self.warm_standby else ''}")
+        return True
+    
+    def stop(self):
+        """Stop supervising; the daemon itself is stopped with SignalCLI.stop_daemon"""
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout=self.check_interval + 5)
+            self._thread = None
+        
+        standby, self._standby = self._standby, None
+        if standby and standby.poll() is None:
+            standby.terminate()
+            standby.wait()
+    
+    def _spawn_standby(self):
+        """Start a standby daemon if there is no live one, backing off while standbys keep failing"""
+        now = time.monotonic()
+        standby = self._standby
+        if standby is not None:
+            exit_code = standby.poll()
+            if exit_code is None:
+                if now - self._standby_started_at >= self.stable_after:
+                    self._standby_backoff = self.initial_backoff
+                return
+            self._standby = None
+            self._standby_failed(f"Standby signal-cli daemon exited with code {exit_code}")
+        
+        if now < self._standby_retry_at:
+            return
+        
+        self._standby = self.signal._spawn_daemon()
+        self._standby_started_at = time.monotonic()
+        if self._standby is None:
+            self._standby_failed("Standby signal-cli daemon could not be started")
+    
+    def _standby_failed(self, reason: str):
+        """Count a failed standby and schedule the next attempt"""
+        with self._stats_lock:
+            self._stats.standby_failures += 1
+        logger.error(f"{reason}; next attempt in {self._standby_backoff:.1f}s")
+        self._standby_retry_at = time.monotonic() + self._standby_backoff
+        self._standby_backoff = min(self._standby_backoff * 2, self.max_backoff)
+    
+    def _monitor(self):
+        """Supervisor thread: wait for the daemon to exit and bring it back"""
+        backoff = self.initial_backoff
+        
+        while not self._stopping.is_set():
+            process = self.signal.daemon_process
+            if process is None:
+                # Daemon was stopped outside the supervisor
+                return
+            
+            try:
+                exit_code = process.wait(timeout=self.check_interval)
+            except subprocess.TimeoutExpired:
+                self._check_health(process)
+                if self.warm_standby:
+                    self._spawn_standby()
+                continue
+            
+            if self._stopping.is_set():
+                return
+            
+            failed_at = time.monotonic()
+            stable = failed_at - self._started_at >= self.stable_after
+            tail = "\n".join(self.signal.daemon_stderr_tail)
+            logger.error(
+                f"Signal CLI daemon exited with code {exit_code}"
+                + (f"; last stderr output:\n{tail}" if tail else "")
+            )
+            with self._stats_lock:
+                self._stats.last_exit_code = exit_code
+                self._stats.last_failure_at = time.time()
+            
+            if stable:
+                backoff = self.initial_backoff
+            
+            failover = self._promote_standby()
+            if not failover and not self._restart(0.0 if stable else backoff):
+                return
+            if not stable and not failover:
+                backoff = min(backoff * 2, self.max_backoff)
+            
+            self._started_at = time.monotonic()
+            self._reset_health()
+            downtime = self._started_at - failed_at
+            with self._stats_lock:
+                self._stats.restarts += 1
+                self._stats.failovers += int(failover)
+                self._stats.total_downtime_seconds += downtime
+            logger.info(
+                f"Signal CLI daemon {'failed over to standby' if failover else 'restarted'} "
+                f"after {downtime:.3f}s"
             )
             
+            if self.warm_standby:
+                self._spawn_standby()
+    
+    def _reset_health(self):
+        """Forget probes sent to a previous daemon; the next one goes out after health_interval"""
+        probe, self._health_probe = self._health_probe, None
+        if probe is not None and self.signal.rpc_session:
+            self.signal.rpc_session.discard(probe)
+        self._health_sent_at = time.monotonic()
+        self._health_failures = 0
+    
+    def _check_health(self, process: subprocess.Popen):
+        """Probe a live daemon over the JSON-RPC session and kill it once it stops answering"""
+        session = self.signal.rpc_session
+        if not self.health_interval or session is None or session.process is not process:
+            return
+        
+        now = time.monotonic()
+        probe = self._health_probe
+        if probe is not None:
+            if probe.done():
+                # Any response, even an error, shows the JVM is still serving requests
+                self._health_probe = None
+                self._health_failures = 0
+            elif now - self._health_sent_at >= self.health_timeout:
+                session.discard(probe)
+                self._health_probe = None
+                self._health_failures += 1
+                with self._stats_lock:
+                    self._stats.health_check_failures += 1
+                logger.warning(
+                    f"Signal CLI daemon did not answer a health check within {self.health_timeout}s "
+                    f"({self._health_failures}/{self.max_health_failures})"
+                )
+                if self._health_failures >= self.max_health_failures:
+                    logger.error("Signal CLI daemon is unresponsive, restarting it")
+                    process.kill()
+                    return
+            else:
+                return
+        
+        if now - self._health_sent_at >= self.health_interval:
+            self._health_probe = session.submit("version")
+            self._health_sent_at = now
+    
+    def _promote_standby(self) -> bool:
+        """Attach the warm standby as the active daemon, if it is alive"""
+        standby, self._standby = self._standby, None
+        if standby is None or standby.poll() is not None:
+            return False
+        self.signal._attach_daemon(standby)
+        return True
+    
+    def _restart(self, delay: float) -> bool:
+        """Start a fresh daemon, backing off between failed attempts; False if stopping"""
+        while not self._stopping.wait(delay):
+            if self.signal.start_daemon():
+                return True
+            with self._stats_lock:
+                self._stats.start_failures += 1
+            delay = min(max(delay * 2, self.initial_backoff), self.max_backoff)
+        return False
+
+
+@dataclass
+class CommandStats:
+    """Latency metrics for one bot command"""
+    count: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    
+    @property
+    def avg_seconds(self) -> float:
+        """Mean handler latency over completed runs"""
+        return self.total_seconds / self.count if self.count else 0.0
+
+
+class CommandDispatcher:
+    """
+    Runs bot command handlers on a bounded thread pool
+    
+    Jobs submitted under the same key (the sender) run one at a time in arrival
+    order, while different senders run in parallel. The handler timeout counts
+    from when a worker starts the handler, so time spent waiting for a free
+    worker is neither reported as a timeout nor included in latency. A job that
+    exceeds the timeout is reported and its sender's queue moves on; the thread
+    it occupies is released when the handler eventually returns.
+    """
+    
+    def __init__(self, max_workers: int = 8, handler_timeout: float = 30.0, max_pending: int = 1000):
+        """
+        Initialize command dispatcher
+        
+        Args:
+            max_workers: Maximum number of handlers running at once
+            handler_timeout: Seconds before a running handler is reported as timed out
+            max_pending: Maximum number of queued jobs; further submissions are rejected
+        """
+        self.max_workers = max_workers
+        self.handler_timeout = handler_timeout
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._queues: Dict[str, deque] = {}
+        self._pending = 0
+        self._running: List[Dict[str, Any]] = []
+        self._stats: Dict[str, CommandStats] = {}
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+    
+    def submit(
+        self,
+        key: str,
+        command: str,
+        func: Callable[[], None],
+        on_timeout: Optional[Callable[[], None]] = None
+    ) -> bool:
+        """
+        Queue a handler call
+        
+        Args:
+            key: Ordering key; jobs with the same key never run concurrently
+            command: Command name used for metrics
+            func: Handler call to run
+            on_timeout: Called once if the handler exceeds the timeout
+            
+        Returns:
+            bool: False if the dispatcher is saturated and the job was dropped
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                logger.warning(f"Command queue full, dropping {command} from {key}")
+                return False
+            
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="signal-command"
+                )
+            
+            self._pending += 1
+            sender_queue = self._queues.get(key)
+            if sender_queue is not None:
+                # The sender already has a job running; this one runs after it
+                sender_queue.append((command, func, on_timeout))
+                return True
+            
+            self._queues[key] = deque()
+            self._start_job(key, (command, func, on_timeout))
+        return True
+    
+    def metrics(self) -> Dict[str, CommandStats]:
+        """Snapshot of per-command latency metrics"""
+        with self._lock:
+            return {command: replace(stats) for command, stats in self._stats.items()}
+    
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the handler of every queued job has returned
+        
+        Returns:
+            bool: True if the dispatcher went idle within the timeout
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout=timeout)
+    
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work, optionally waiting for queued jobs first"""
+        if wait:
+            self.wait_idle(timeout=self.handler_timeout)
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+            # Abandon anything still queued or running so late timers and handlers stay silent
+            for state in self._running:
+                state['abandoned'] = True
+                if state['timer']:
+                    state['timer'].cancel()
+            self._running.clear()
+            self._queues.clear()
+            self._pending = 0
+            self._idle.notify_all()
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _start_job(self, key: str, job):
+        """Hand a job to the pool; must be called with the lock held"""
+        command, func, on_timeout = job
+        state = {'finished': False, 'abandoned': False, 'started': None, 'timer': None}
+        self._running.append(state)
+        self._executor.submit(self._run_job, key, command, func, on_timeout, state)
+    
+    def _run_job(self, key: str, command: str, func: Callable[[], None],
+                 on_timeout: Optional[Callable[[], None]], state: Dict[str, Any]):
+        """Worker: run the handler and record its outcome"""
+        with self._lock:
+            if state['abandoned']:
+                return
+            # Time the handler from when a worker picks it up, not while it waits for one
+            state['started'] = time.monotonic()
+            timer = threading.Timer(self.handler_timeout, self._on_timeout, args=(key, command, state, on_timeout))
+            timer.daemon = True
+            state['timer'] = timer
+            timer.start()
+        
+        failed = False
+        try:
+            func()
         except Exception as e:
-            logger.error(f"Parse message error: {e}")
+            failed = True
+            logger.error(f"Error handling command {command}: {e}")
+        finally:
+            timer.cancel()
+            self._finish(key, command, state, time.monotonic() - state['started'], failed=failed, handler_done=True)
+    
+    def _on_timeout(self, key: str, command: str, state: Dict[str, Any], on_timeout: Optional[Callable[[], None]]):
+        """Timer: report a slow handler and let the sender's queue continue"""
+        if not self._finish(key, command, state, self.handler_timeout, timed_out=True):
+            return
+        logger.warning(f"Command {command} from {key} timed out after {self.handler_timeout}s")
+        if on_timeout:
+            try:
+                on_timeout()
+            except Exception as e:
+                logger.error(f"Timeout handler error for {command}: {e}")
+    
+    def _finish(self, key: str, command: str, state: Dict[str, Any], elapsed: float,
+                failed: bool = False, timed_out: bool = False, handler_done: bool = False) -> bool:
+        """
+        Record a job's outcome and start the sender's next one; False if already recorded
+        
+        A timed-out job is recorded when its timer fires, but stays pending until
+        its handler returns, so wait_idle() never reports idle under a running handler.
+        """
+        with self._lock:
+            if state['abandoned']:
+                return False
+            if handler_done:
+                self._running.remove(state)
+                self._pending -= 1
+            
+            recorded = not state['finished']
+            if recorded:
+                state['finished'] = True
+                stats = self._stats.setdefault(command, CommandStats())
+                stats.count += 1
+                stats.total_seconds += elapsed
+                stats.max_seconds = max(stats.max_seconds, elapsed)
+                stats.errors += int(failed)
+                stats.timeouts += int(timed_out)
+                
+                sender_queue = self._queues.get(key)
+                if sender_queue and self._executor is not None:
+                    self._start_job(key, sender_queue.popleft())
+                else:
+                    self._queues.pop(key, None)
+            
+            if self._pending == 0:
+                self._idle.notify_all()
+        return recorded
+
+
+@dataclass(slots=True, eq=False)
+class CommandRoute:
+    """A registered bot command"""
+    name: str
+    handler: Optional[Callable]
+    description: str = ''
+    aliases: tuple = ()
+    rate_limiter: Optional[KeyedRateLimiter] = None
+    subcommands: Optional["CommandRouter"] = None
+
+
+class _TrieNode:
+    """One character step in the command trie"""
+    __slots__ = ('children', 'route', 'only')
+    
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # Route registered at exactly this key
+        self.route: Optional[CommandRoute] = None
+        # The single route reachable below this node, or _AMBIGUOUS
+        self.only: Optional[CommandRoute] = None
+
+
+_AMBIGUOUS = CommandRoute(name='', handler=None)
+
+
+class CommandRouter:
+    """
+    Prefix trie of bot commands
+    
+    Commands are matched character by character, so routing costs O(length of
+    the command). An exact name or alias wins; otherwise a prefix that leads to
+    exactly one command (e.g. '!pi' for '!ping') matches it. Space-separated
+    names such as '!group list' register subcommands under '!group'.
+    """
+    
+    def __init__(self):
+        self._root = _TrieNode()
+        self._routes: List[CommandRoute] = []
+        self._help_text: Optional[str] = None
+    
+    def add(
+        self,
+        command: str,
+        handler: Callable,
+        aliases: tuple = (),
+        description: str = '',
+        rate_limit: Optional[float] = None
+    ) -> CommandRoute:
+        """
+        Register a command
+        
+        Args:
+            command: Command string, optionally with subcommand words (e.g. '!group list')
+            handler: Function called as handler(bot, message, args)
+            aliases: Alternative names for the last word of the command
+            description: One line shown in the help text
+            rate_limit: Maximum uses per sender per minute, unlimited if None
+            
+        Returns:
+            The registered CommandRoute
+        """
+        words = command.lower().split()
+        router = self
+        for word in words[:-1]:
+            parent = router._lookup(word)
+            if parent is None:
+                parent = router._insert(word, CommandRoute(name=word, handler=None))
+            if parent.subcommands is None:
+                parent.subcommands = CommandRouter()
+            router = parent.subcommands
+        
+        route = CommandRoute(
+            name=command.lower(),
+            handler=handler,
+            description=description,
+            aliases=tuple(alias.lower() for alias in aliases),
+            rate_limiter=KeyedRateLimiter(rate=rate_limit / 60, burst=rate_limit) if rate_limit else None
+        )
+        existing = router._lookup(words[-1])
+        if existing is not None and existing.handler is None:
+            # Keep subcommands registered before their parent command
+            route.subcommands = existing.subcommands
+        router._insert(words[-1], route)
+        for alias in route.aliases:
+            router._insert(alias, route)
+        
+        self._help_text = None
+        return route
+    
+    def route(self, text: str) -> Optional[tuple]:
+        """
+        Match a message to a command
+        
+        Args:
+            text: Message text, e.g. '!group list mine'
+            
+        Returns:
+            (CommandRoute, args) or None if no command matches
+        """
+        word, _, args = text.strip().partition(' ')
+        route = self._match(word.lower())
+        if route is None:
             return None
+        
+        while route.subcommands and args:
+            word, _, rest = args.partition(' ')
+            subroute = route.subcommands._match(word.lower())
+            if subroute is None:
+                break
+            route, args = subroute, rest
+        
+        return route, args.strip()
+    
+    @property
+    def help_text(self) -> str:
+        """Help listing, rebuilt only after commands change"""
+        if self._help_text is None:
+            lines = ["📚 Available Commands:"]
+            for route in sorted(self._iter_routes(), key=lambda r: r.name):
+                line = route.name
+                if route.aliases:
+                    line += f" ({', '.join(route.aliases)})"
+                if route.description:
+                    line += f" - {route.description}"
+                lines.append(line)
+            self._help_text = "\n".join(lines) + "\n"
+        return self._help_text
+    
+    def routes(self) -> List[CommandRoute]:
+        """Every routable command, including subcommands"""
+        return list(self._iter_routes())
+    
+    def _iter_routes(self):
+        """Yield every routable command, including subcommands"""
+        for route in self._routes:
+            if route.handler is not None:
+                yield route
+            if route.subcommands:
+                yield from route.subcommands._iter_routes()
+    
+    def _insert(self, key: str, route: CommandRoute) -> CommandRoute:
+        """Store route under key, keeping unique-prefix markers up to date"""
+        node = self._root
+        path = [node]
+        for char in key:
+            node = node.children.setdefault(char, _TrieNode())
+            path.append(node)
+        
+        previous = node.route
+        if previous is not None and previous is not route:
+            # Drop every key of the replaced route, so its aliases stop matching too
+            self._unlink(self._root, previous)
+            self._routes = [r for r in self._routes if r is not previous]
+            node.route = route
+            # Replaced routes may still be marked as the only match above; recompute
+            self._refresh_only(self._root)
+        else:
+            node.route = route
+            for step in path:
+                if step.only is None:
+                    step.only = route
+                elif step.only is not route:
+                    step.only = _AMBIGUOUS
+        
+        if route not in self._routes:
+            self._routes.append(route)
+        return route
+    
+    def _unlink(self, node: _TrieNode, route: CommandRoute):
+        """Clear every key below node that points at route"""
+        if node.route is route:
+            node.route = None
+        for child in node.children.values():
+            self._unlink(child, route)
+    
+    def _refresh_only(self, node: _TrieNode) -> Optional[CommandRoute]:
+        """Recompute unique-prefix markers below node"""
+        only = node.route
+        for child in node.children.values():
+            child_only = self._refresh_only(child)
+            if child_only is None:
+                continue
+            if only is None:
+                only = child_only
+            elif only is not child_only:
+                only = _AMBIGUOUS
+        node.only = only
+        return only
+    
+    def _lookup(self, key: str) -> Optional[CommandRoute]:
+        """Exact lookup of a name or alias"""
+        node = self._root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node.route
+    
+    def _match(self, key: str) -> Optional[CommandRoute]:
+        """Exact match, falling back to a prefix shared by exactly one command"""
+        node = self._root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        if node.route is not None:
+            return node.route
+        if node is not self._root and node.only is not _AMBIGUOUS and len(key) > 1:
+            return node.only
+        return None
 
 
 class SignalBot:
@@ -357,38 +1986,78 @@ class SignalBot:
     Signal Bot implementation using SignalCLI
     """
     
-    def __init__(self, phone_number: str, commands: Optional[Dict[str, callable]] = None):
+    def __init__(
+        self,
+        phone_number: str,
+        commands: Optional[Dict[str, callable]] = None,
+        max_workers: int = 8,
+        handler_timeout: float = 30.0,
+        signal_cli_path: str = "signal-cli",
+        use_json_rpc: bool = False,
+        supervise: bool = True,
+        warm_standby: bool = False
+    ):
         """
         Initialize Signal Bot
         
         Args:
             phone_number: Bot's phone number
             commands: Dictionary of command handlers
+            max_workers: Maximum number of command handlers running at once
+            handler_timeout: Seconds before a command is reported as timed out
+            signal_cli_path: Path to signal-cli executable
+            use_json_rpc: Receive and reply over one persistent JSON-RPC session instead of
+                a daemon plus a signal-cli process per reply
+            supervise: Restart the signal-cli daemon when it exits
+            warm_standby: Keep a standby daemon started for fast failover (requires supervise)
         """
-        self.signal = SignalCLI(phone_number)
-        self.commands = commands or {}
+        self.signal = SignalCLI(phone_number, signal_cli_path, use_json_rpc=use_json_rpc)
+        self.router = CommandRouter()
         self.running = False
+        self.idle_timeout = 0.5
+        self.dispatcher = CommandDispatcher(max_workers=max_workers, handler_timeout=handler_timeout)
+        self.supervisor = DaemonSupervisor(self.signal, warm_standby=warm_standby) if supervise else None
+        # Unknown-command replies per sender: a burst of 2, then one every 30 seconds
+        self.unknown_command_limiter = KeyedRateLimiter(rate=1 / 30, burst=2)
         
         # Register default commands
-        self.register_command('!help', self._help_command)
-        self.register_command('!ping', self._ping_command)
+        self.register_command('!help', self._help_command, description='Show available commands')
+        self.register_command('!ping', self._ping_command, description='Check that the bot is responding')
+        for command, handler in (commands or {}).items():
+            self.register_command(command, handler)
     
-    def register_command(self, command: str, handler: callable):
+    def register_command(
+        self,
+        command: str,
+        handler: callable,
+        aliases: tuple = (),
+        description: str = '',
+        rate_limit: Optional[float] = None
+    ):
         """
         Register a command handler
         
         Args:
-            command: Command string (e.g., '!help')
+            command: Command string (e.g., '!help'), or with subcommands (e.g., '!group list')
             handler: Function to call when command is received
+            aliases: Alternative names (e.g., ('!h',))
+            description: One line shown by !help
+            rate_limit: Maximum uses per sender per minute, unlimited if None
         """
-        self.commands[command.lower()] = handler
+        self.router.add(command, handler, aliases=aliases, description=description, rate_limit=rate_limit)
         logger.info(f"Registered command: {command}")
     
+    @property
+    def commands(self) -> Mapping[str, callable]:
+        """Read-only view of command handlers by name; change commands with register_command"""
+        return MappingProxyType({route.name: route.handler for route in self.router.routes()})
+    
     def start(self):
         """Start the bot"""
         logger.info("Starting Signal bot...")
         
-        if not self.signal.start_daemon():
+        started = self.supervisor.start() if self.supervisor else self.signal.start_daemon()
+        if not started:
             logger.error("Failed to start Signal daemon")
             return
         
@@ -397,12 +2066,15 @@ class SignalBot:
         
         try:
             while self.running:
-                messages = self.signal.read_daemon_messages()
+                # Block until a message arrives; the timeout only bounds how
+                # long a stop request or a dead daemon goes unnoticed
+                msg = self.signal.next_daemon_message(timeout=self.idle_timeout)
                 
-                for msg in messages:
+                if msg:
                     self._handle_message(msg)
-                
-                time.sleep(1)  # Poll every second
+                elif not self.signal.daemon_running and not (self.supervisor and self.supervisor.running):
+                    logger.error("Signal daemon exited, stopping bot")
+                    break
                 
         except KeyboardInterrupt:
             logger.info("Bot interrupted by user")
@@ -412,13 +2084,20 @@ class SignalBot:
     def stop(self):
         """Stop the bot"""
         self.running = False
+        if self.supervisor:
+            self.supervisor.stop()
+        self.dispatcher.shutdown()
         self.signal.stop_daemon()
+        self.signal.stop_session()
         logger.info("Signal bot stopped")
     
     def _handle_message(self, message: SignalMessage):
         """
         Handle incoming message
         
+        Commands are handed to the dispatcher so the receive loop never waits on a
+        handler; each sender's commands still run in the order they were sent.
+        
         Args:
             message: SignalMessage object
         """
@@ -426,32 +2105,55 @@ class SignalBot:
         
         # Check if it's a command
         if message.message.startswith('!'):
-            parts = message.message.split(' ', 1)
-            command = parts[0].lower()
-            args = parts[1] if len(parts) > 1 else ''
+            sender = message.source_number or message.source_uuid
+            match = self.router.route(message.message)
             
-            if command in self.commands:
-                try:
-                    self.commands[command](self, message, args)
-                except Exception as e:
-                    logger.error(f"Error handling command {command}: {e}")
-                    self.signal.send_message(
+            if match and match[0].handler:
+                route, args = match
+                command = route.name
+                if route.rate_limiter and not route.rate_limiter.allow(sender):
+                    logger.info(f"Rate limited {command} from {sender}")
+                    return
+                
+                self.dispatcher.submit(
+                    sender,
+                    command,
+                    lambda: self._run_command(route.handler, message, args),
+                    on_timeout=lambda: self.signal.send_message(
                         message.source_number,
-                        f"Error processing command: {e}"
+                        f"Command {command} is taking longer than expected."
                     )
+                )
             else:
-                self.signal.send_message(
-                    message.source_number,
-                    f"Unknown command: {command}. Type !help for available commands."
+                command = message.message.split(' ', 1)[0].lower()
+                if not self.unknown_command_limiter.allow(sender):
+                    # Don't answer unknown-command spam with outbound sends
+                    logger.info(f"Suppressed unknown command reply to {sender}")
+                    return
+                
+                self.dispatcher.submit(
+                    sender,
+                    'unknown',
+                    lambda: self.signal.send_message(
+                        message.source_number,
+                        f"Unknown command: {command}. Type !help for available commands."
+                    )
                 )
     
+    def _run_command(self, handler: callable, message: SignalMessage, args: str):
+        """Run a command handler, reporting failures back to the sender"""
+        try:
+            handler(self, message, args)
+        except Exception as e:
+            self.signal.send_message(
+                message.source_number,
+                f"Error processing command: {e}"
+            )
+            raise
+    
     def _help_command(self, bot, message: SignalMessage, args: str):
         """Default help command handler"""
-        help_text = "📚 Available Commands:\n"
-        for cmd in sorted(self.commands.keys()):
-            help_text += f"{cmd}\n"
-        
-        bot.signal.send_message(message.source_number, help_text)
+        bot.signal.send_message(message.source_number, self.router.help_text)
     
     def _ping_command(self, bot, message: SignalMessage, args: str):
         """Default ping command handler"""
@@ -480,8 +2182,8 @@ Name: {message.source_name or 'Not set'}
     bot = SignalBot(bot_phone)
     
     # Register custom commands
-    bot.register_command('!echo', echo_command)
-    bot.register_command('!info', info_command)
+    bot.register_command('!echo', echo_command, description='Echo back the arguments')
+    bot.register_command('!info', info_command, aliases=('!whoami',), description='Show your info')
     
     # Start bot
     bot.start()
\ No newline at end of file
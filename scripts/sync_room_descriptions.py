@@ -5,10 +5,17 @@ Matrix Room Description Sync Script
 This script fetches room descriptions from the Matrix API using configured room IDs
 and stores them in the database for fast room recommendations without repeated API calls.
 
+Rooms are fetched concurrently and upserted in a single transaction. Every room
+is still fetched; the Matrix client exposes no ETag or cheaper change check for
+room state. Rooms whose synced columns match the stored row only have last_synced
+bumped, and with --skip-unchanged they are not written at all. Rooms whose fetch
+failed keep their stored row.
+
 Usage:
-    python scripts/sync_room_descriptions.py
+    python scripts/sync_room_descriptions.py [--skip-unchanged] [--concurrency N]
 """
 
+import argparse
 import asyncio
 import logging
 import os
@@ -32,12 +39,19 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Maximum number of rooms fetched from the homeserver at once
+DEFAULT_CONCURRENCY = 10
+
+# MatrixRoom columns populated from the Matrix API / configuration
+SYNCED_FIELDS = ('name', 'display_name', 'topic', 'canonical_alias', 'member_count')
+
 class RoomDescriptionSyncer:
     """Handles syncing room descriptions from Matrix API to database."""
     
-    def __init__(self):
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY):
         self.client = None
         self.db: Optional[Session] = None
+        self.concurrency = max(1, concurrency)
         
     async def initialize(self):
         """Initialize Matrix client and database connection."""
@@ -82,8 +96,15 @@ class RoomDescriptionSyncer:
     async def fetch_room_info(self, room_id: str) -> Optional[Dict[str, str]]:
         """Fetch room information from Matrix API."""
         try:
-            # Get room state events
-            room_state = await self.client.room_get_state(room_id)
+            # State and membership are independent requests, so issue them together
+            room_state, members_response = await asyncio.gather(
+                self.client.room_get_state(room_id),
+                self.client.joined_members(room_id),
+                return_exceptions=True
+            )
+            
+            if isinstance(room_state, Exception):
+                raise room_state
             
             if hasattr(room_state, 'transport_response') and room_state.transport_response.status != 200:
                 logger.warning(f"Failed to get state for room {room_id}: {room_state}")
@@ -107,12 +128,10 @@ class RoomDescriptionSyncer:
                         room_info['canonical_alias'] = event.get('content', {}).get('alias', '')
             
             # Get member count
-            try:
-                members_response = await self.client.joined_members(room_id)
-                if hasattr(members_response, 'members'):
-                    room_info['member_count'] = len(members_response.members)
-            except Exception as e:
-                logger.warning(f"Could not get member count for {room_id}: {e}")
+            if isinstance(members_response, Exception):
+                logger.warning(f"Could not get member count for {room_id}: {members_response}")
+            elif hasattr(members_response, 'members'):
+                room_info['member_count'] = len(members_response.members)
             
             logger.info(f"Fetched info for room {room_id}: {room_info['name']}")
             return room_info
@@ -121,47 +140,99 @@ class RoomDescriptionSyncer:
             logger.error(f"Error fetching room info for {room_id}: {e}")
             return None
     
-    def store_room_info(self, room_id: str, room_info: Dict[str, str], configured_data: Dict[str, str]):
-        """Store or update room information in database."""
+    async def fetch_all_rooms(self, room_ids: List[str]) -> Dict[str, Optional[Dict[str, str]]]:
+        """Fetch room information for many rooms concurrently, bounded by a semaphore."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def fetch(room_id: str):
+            async with semaphore:
+                return room_id, await self.fetch_room_info(room_id)
+        
+        results = await asyncio.gather(*(fetch(room_id) for room_id in room_ids))
+        return dict(results)
+    
+    @staticmethod
+    def build_room_values(room_info: Dict[str, str], configured_data: Dict[str, str]) -> Dict[str, object]:
+        """Merge fetched room information with configured data into MatrixRoom column values."""
+        return {
+            'name': room_info.get('name') or configured_data.get('name', ''),
+            'display_name': configured_data.get('name', '') or room_info.get('name', ''),
+            'topic': room_info.get('topic') or configured_data.get('description', ''),
+            'canonical_alias': room_info.get('canonical_alias', ''),
+            'member_count': room_info.get('member_count', 0),
+        }
+    
+    def store_all_rooms(
+        self,
+        room_infos: Dict[str, Optional[Dict[str, str]]],
+        configured_rooms: Dict[str, Dict[str, str]],
+        skip_unchanged: bool = False
+    ) -> Dict[str, int]:
+        """
+        Upsert all rooms in a single transaction.
+        
+        Rooms whose synced columns match the stored row are left alone with
+        skip_unchanged; otherwise only their last_synced timestamp is bumped.
+        Rooms whose fetch failed are only created from configured data, never
+        written over an existing row.
+        """
+        stats = {'created': 0, 'updated': 0, 'unchanged': 0, 'failed': 0}
+        now = datetime.utcnow()
+        
         try:
-            # Check if room already exists
-            existing_room = self.db.query(MatrixRoom).filter(MatrixRoom.room_id == room_id).first()
+            existing_rooms = {
+                room.room_id: room
+                for room in self.db.query(MatrixRoom).filter(
+                    MatrixRoom.room_id.in_(list(room_infos.keys()))
+                ).all()
+            }
             
-            if existing_room:
-                # Update existing room
-                existing_room.name = room_info.get('name') or configured_data.get('name', '')
-                existing_room.display_name = configured_data.get('name', '') or room_info.get('name', '')
-                existing_room.topic = room_info.get('topic') or configured_data.get('description', '')
-                existing_room.canonical_alias = room_info.get('canonical_alias', '')
-                existing_room.member_count = room_info.get('member_count', 0)
-                existing_room.last_synced = datetime.utcnow()
-                existing_room.updated_at = datetime.utcnow()
+            for room_id, room_info in room_infos.items():
+                existing_room = existing_rooms.get(room_id)
+                if room_info is None and existing_room is not None:
+                    # Keep the last good data instead of overwriting it with blanks
+                    stats['failed'] += 1
+                    continue
                 
-                logger.info(f"Updated room {room_id} in database")
-            else:
-                # Create new room
-                new_room = MatrixRoom(
-                    room_id=room_id,
-                    name=room_info.get('name') or configured_data.get('name', ''),
-                    display_name=configured_data.get('name', '') or room_info.get('name', ''),
-                    topic=room_info.get('topic') or configured_data.get('description', ''),
-                    canonical_alias=room_info.get('canonical_alias', ''),
-                    member_count=room_info.get('member_count', 0),
-                    room_type='public',  # Assume public for configured rooms
-                    is_direct=False,
-                    last_synced=datetime.utcnow()
-                )
+                values = self.build_room_values(room_info or {}, configured_rooms.get(room_id, {}))
+                if existing_room is None:
+                    self.db.add(MatrixRoom(
+                        room_id=room_id,
+                        room_type='public',  # Assume public for configured rooms
+                        is_direct=False,
+                        last_synced=now,
+                        **values
+                    ))
+                    stats['created'] += 1
+                    continue
                 
-                self.db.add(new_room)
-                logger.info(f"Created new room {room_id} in database")
+                stored_values = {key: getattr(existing_room, key) for key in SYNCED_FIELDS}
+                if stored_values == values:
+                    stats['unchanged'] += 1
+                    if not skip_unchanged:
+                        existing_room.last_synced = now
+                    continue
+                
+                for key, value in values.items():
+                    setattr(existing_room, key, value)
+                existing_room.last_synced = now
+                existing_room.updated_at = now
+                stats['updated'] += 1
             
             self.db.commit()
+            logger.info(
+                f"Stored rooms: {stats['created']} created, {stats['updated']} updated, "
+                f"{stats['unchanged']} unchanged, {stats['failed']} kept after failed fetch"
+            )
             
         except Exception as e:
-            logger.error(f"Error storing room info for {room_id}: {e}")
+            logger.error(f"Error storing room info: {e}")
             self.db.rollback()
+            raise
+        
+        return stats
     
-    async def sync_all_rooms(self):
+    async def sync_all_rooms(self, skip_unchanged: bool = False):
         """Sync all configured rooms with Matrix API."""
         configured_rooms = self.get_configured_rooms()
         
@@ -169,29 +240,24 @@ class RoomDescriptionSyncer:
             logger.warning("No configured rooms found")
             return
         
-        success_count = 0
-        error_count = 0
+        logger.info(
+            f"Syncing {len(configured_rooms)} rooms "
+            f"({'skipping unchanged' if skip_unchanged else 'full'}, concurrency {self.concurrency})"
+        )
         
-        for room_id, configured_data in configured_rooms.items():
-            try:
-                logger.info(f"Syncing room: {room_id} ({configured_data.get('name', 'Unknown')})")
-                
-                # Fetch room info from Matrix API
-                room_info = await self.fetch_room_info(room_id)
-                
-                if room_info:
-                    # Store in database
-                    self.store_room_info(room_id, room_info, configured_data)
-                    success_count += 1
-                else:
-                    # Store configured data even if API fetch failed
-                    self.store_room_info(room_id, {}, configured_data)
-                    error_count += 1
-                    logger.warning(f"Used configured data for {room_id} due to API fetch failure")
-                
-            except Exception as e:
-                logger.error(f"Error syncing room {room_id}: {e}")
+        # Fetch room info from Matrix API
+        room_infos = await self.fetch_all_rooms(list(configured_rooms.keys()))
+        
+        error_count = 0
+        for room_id, room_info in room_infos.items():
+            if not room_info:
+                # New rooms are stored from configured data; existing rows are kept
                 error_count += 1
+                logger.warning(f"API fetch failed for {room_id}")
+        success_count = len(room_infos) - error_count
+        
+        # Store in database
+        self.store_all_rooms(room_infos, configured_rooms, skip_unchanged=skip_unchanged)
         
         logger.info(f"Room sync completed. Success: {success_count}, Errors: {error_count}")
     
@@ -202,9 +268,26 @@ class RoomDescriptionSyncer:
         if self.db:
             self.db.close()
 
-async def main():
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Sync Matrix room descriptions into the database")
+    parser.add_argument(
+        '--skip-unchanged',
+        action='store_true',
+        help='Do not write rooms whose synced columns are unchanged (every room is still fetched)'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f'Maximum number of rooms fetched concurrently (default: {DEFAULT_CONCURRENCY})'
+    )
+    return parser.parse_args(argv)
+
+async def main(argv: Optional[List[str]] = None):
     """Main function to run the room description sync."""
-    syncer = RoomDescriptionSyncer()
+    args = parse_args(argv)
+    syncer = RoomDescriptionSyncer(concurrency=args.concurrency)
     
     try:
         logger.info("Starting Matrix room description sync...")
@@ -215,7 +298,7 @@ async def main():
             return 1
         
         # Sync all rooms
-        await syncer.sync_all_rooms()
+        await syncer.sync_all_rooms(skip_unchanged=args.skip_unchanged)
         
         logger.info("Room description sync completed successfully")
         return 0
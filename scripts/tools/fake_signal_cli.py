@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Fake signal-cli
+
+A stand-in for the signal-cli executable so SignalCLI and SignalBot can be
+exercised without a registered number. Point SignalCLI's signal_cli_path at
+this file. It understands the subcommands the Python wrapper uses:
+daemon, receive, send, getUserStatus, listGroups, jsonRpc, register and verify.
+
+Like signal-cli, every command holds an exclusive lock on the account while it
+runs, so a second process for the same account waits until the first exits.
+jsonRpc honours --receive-mode: messages are pushed as `receive` notifications
+on start (on-start, the default) or after a subscribeReceive request (manual).
+
+Behaviour is scripted through environment variables:
+    FAKE_SIGNAL_SCRIPT        JSONL file of envelopes to emit (objects, or {"envelope": ...})
+    FAKE_SIGNAL_MESSAGES      Number of generated data messages when no script is given (default: 0)
+    FAKE_SIGNAL_COMMANDS      Comma-separated message texts to cycle through (default: !ping);
+                              '{seq}' is replaced with the message sequence number
+    FAKE_SIGNAL_SENDERS       Number of distinct generated senders (default: 10)
+    FAKE_SIGNAL_RATE          Generated messages per second, 0 for as fast as possible (default: 0)
+    FAKE_SIGNAL_NOISE         Receipt/typing envelopes emitted per data message (default: 0)
+    FAKE_SIGNAL_LATENCY_MS    Delay before answering send/getUserStatus/listGroups (default: 0)
+    FAKE_SIGNAL_STARTUP_MS    Delay before doing anything, like a JVM start (default: 0)
+    FAKE_SIGNAL_ERROR_RATE    Probability that a command fails (default: 0)
+    FAKE_SIGNAL_LINGER        Seconds the daemon stays up after its messages (default: 0)
+    FAKE_SIGNAL_LOCK_DIR      Directory for the per-account lock files (default: system temp dir)
+    FAKE_SIGNAL_LOG           File that sent messages are appended to as JSON lines
+
+Usage:
+    FAKE_SIGNAL_MESSAGES=5 python3 scripts/tools/fake_signal_cli.py -a +15550000000 daemon --json
+"""
+
+import fcntl
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+
+def env_float(name, default=0.0):
+    """Read a numeric environment variable."""
+    return float(os.environ.get(name, default) or default)
+
+
+LATENCY = env_float('FAKE_SIGNAL_LATENCY_MS') / 1000
+ERROR_RATE = env_float('FAKE_SIGNAL_ERROR_RATE')
+GROUP_ID = 'ZmFrZS1ncm91cC1pZA=='
+
+
+def now_ms():
+    """Current time in epoch milliseconds, as used by Signal timestamps."""
+    return int(time.time() * 1000)
+
+
+def sender_number(index):
+    """Phone number for a generated sender."""
+    return f'+1555{index:07d}'
+
+
+def generate_envelopes():
+    """Yield envelopes from FAKE_SIGNAL_SCRIPT, or generated ones."""
+    script = os.environ.get('FAKE_SIGNAL_SCRIPT')
+    if script:
+        with open(script, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    data = json.loads(line)
+                    envelope = data.get('envelope', data)
+                    envelope['timestamp'] = now_ms()
+                    yield envelope
+        return
+
+    count = int(env_float('FAKE_SIGNAL_MESSAGES'))
+    commands = os.environ.get('FAKE_SIGNAL_COMMANDS', '!ping').split(',')
+    senders = max(1, int(env_float('FAKE_SIGNAL_SENDERS', 10)))
+    noise = int(env_float('FAKE_SIGNAL_NOISE'))
+    rate = env_float('FAKE_SIGNAL_RATE')
+    started = time.monotonic()
+
+    for seq in range(count):
+        if rate:
+            delay = started + seq / rate - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        number = sender_number(seq % senders)
+        base = {'source': number, 'sourceNumber': number, 'sourceUuid': f'fake-uuid-{seq % senders}',
+                'sourceName': f'Load Tester {seq % senders}', 'sourceDevice': 1}
+        for _ in range(noise):
+            yield dict(base, timestamp=now_ms(), typingMessage={'action': 'STARTED', 'timestamp': now_ms()})
+        text = commands[seq % len(commands)].replace('{seq}', str(seq))
+        yield dict(base, timestamp=now_ms(), dataMessage={'timestamp': now_ms(), 'message': text})
+        for _ in range(noise):
+            yield dict(base, timestamp=now_ms(),
+                       receiptMessage={'when': now_ms(), 'isDelivery': True, 'timestamps': [now_ms()]})
+
+
+def lock_account(account):
+    """Take the account's exclusive lock, waiting like signal-cli while another instance holds it."""
+    lock_dir = os.environ.get('FAKE_SIGNAL_LOCK_DIR') or tempfile.gettempdir()
+    lock_file = open(os.path.join(lock_dir, f"fake-signal-cli-{account.lstrip('+')}.lock"), 'w')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        print('Config file is in use by another instance, waiting…', file=sys.stderr, flush=True)
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+    return lock_file
+
+
+def log_send(recipients, message, group_id=None):
+    """Record an outbound message for the load-test harness."""
+    path = os.environ.get('FAKE_SIGNAL_LOG')
+    if path:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'timestamp': now_ms(), 'recipients': recipients,
+                                'groupId': group_id, 'message': message}) + '\n')
+
+
+def simulate_call():
+    """Apply the configured latency and decide whether the call fails."""
+    if LATENCY:
+        time.sleep(LATENCY)
+    return random.random() >= ERROR_RATE
+
+
+def user_statuses(numbers):
+    """Statuses for getUserStatus; numbers ending in 0000 are unregistered."""
+    return [{'recipient': number, 'number': number, 'uuid': f'fake-uuid-{number[-7:]}',
+             'isRegistered': not number.endswith('0000')} for number in numbers]
+
+
+def run_jsonrpc(account, args):
+    """Serve JSON-RPC requests from stdin until it closes."""
+    write_lock = threading.Lock()
+    receive_mode = 'on-start'
+    for i, arg in enumerate(args):
+        if arg.startswith('--receive-mode='):
+            receive_mode = arg.split('=', 1)[1]
+        elif arg == '--receive-mode' and i + 1 < len(args):
+            receive_mode = args[i + 1]
+    subscribed = threading.Event()
+    unsubscribed = threading.Event()
+
+    def write(payload):
+        with write_lock:
+            sys.stdout.write(json.dumps(payload) + '\n')
+            sys.stdout.flush()
+
+    def push_messages(subscription=None):
+        for envelope in generate_envelopes():
+            if unsubscribed.is_set():
+                return
+            if subscription is None:
+                params = {'envelope': envelope, 'account': account}
+            else:
+                params = {'subscription': subscription, 'result': {'envelope': envelope, 'account': account}}
+            write({'jsonrpc': '2.0', 'method': 'receive', 'params': params})
+
+    def answer(request):
+        method = request.get('method')
+        params = request.get('params') or {}
+        if method == 'subscribeReceive':
+            if not subscribed.is_set():
+                subscribed.set()
+                threading.Thread(target=push_messages, args=(0,), daemon=True).start()
+            write({'jsonrpc': '2.0', 'id': request.get('id'), 'result': 0})
+            return
+        if method == 'unsubscribeReceive':
+            unsubscribed.set()
+            write({'jsonrpc': '2.0', 'id': request.get('id'), 'result': True})
+            return
+        if not simulate_call():
+            write({'jsonrpc': '2.0', 'id': request.get('id'),
+                   'error': {'code': -1, 'message': 'Simulated failure'}})
+            return
+        if method == 'send':
+            recipients = params.get('recipient') or []
+            if isinstance(recipients, str):
+                recipients = [recipients]
+            log_send(recipients, params.get('message'), params.get('groupId'))
+            result = {'timestamp': now_ms(), 'results': [
+                {'recipientAddress': {'number': number}, 'type': 'SUCCESS'} for number in recipients
+            ]}
+        elif method == 'getUserStatus':
+            result = user_statuses(params.get('recipient') or [])
+        elif method == 'listGroups':
+            result = [{'id': GROUP_ID, 'name': 'Fake Group', 'members': []}]
+        elif method == 'version':
+            result = {'version': 'fake'}
+        else:
+            write({'jsonrpc': '2.0', 'id': request.get('id'),
+                   'error': {'code': -32601, 'message': f'Method not implemented: {method}'}})
+            return
+        write({'jsonrpc': '2.0', 'id': request.get('id'), 'result': result})
+
+    if receive_mode == 'on-start':
+        threading.Thread(target=push_messages, daemon=True).start()
+
+    for line in sys.stdin:
+        if line.strip():
+            threading.Thread(target=answer, args=(json.loads(line),), daemon=True).start()
+    return 0
+
+
+def main(argv):
+    """Dispatch a signal-cli style command line."""
+    time.sleep(env_float('FAKE_SIGNAL_STARTUP_MS') / 1000)
+
+    account, output = '', 'plain-text'
+    while len(argv) >= 2 and argv[0] in ('-a', '--account', '-o', '--output'):
+        if argv[0] in ('-a', '--account'):
+            account = argv[1]
+        else:
+            output = argv[1]
+        argv = argv[2:]
+    if not argv:
+        print('usage: fake_signal_cli.py -a ACCOUNT COMMAND [ARGS]', file=sys.stderr)
+        return 2
+    command, args = argv[0], argv[1:]
+    # Held until the process exits
+    account_lock = lock_account(account) if account else None
+
+    if command in ('daemon', 'receive'):
+        for envelope in generate_envelopes():
+            print(json.dumps({'envelope': envelope, 'account': account}), flush=True)
+        if command == 'daemon':
+            time.sleep(env_float('FAKE_SIGNAL_LINGER'))
+        return 0
+
+    if command == 'jsonRpc':
+        return run_jsonrpc(account, args)
+
+    if command in ('register', 'verify'):
+        return 0 if simulate_call() else 1
+
+    if not simulate_call():
+        print('Simulated failure', file=sys.stderr)
+        return 1
+
+    if command == 'send':
+        message, group_id, recipients = None, None, []
+        i = 0
+        while i < len(args):
+            if args[i] == '-m':
+                message, i = args[i + 1], i + 2
+            elif args[i] == '-a':
+                i += 2
+            elif args[i] in ('-g', '--group-id'):
+                group_id, i = args[i + 1], i + 2
+            else:
+                recipients.append(args[i])
+                i += 1
+        log_send(recipients, message, group_id)
+        if output == 'json':
+            print(json.dumps({'timestamp': now_ms(), 'results': [
+                {'recipientAddress': {'number': number}, 'type': 'SUCCESS'} for number in recipients
+            ]}))
+        return 0
+
+    if command == 'getUserStatus':
+        print(json.dumps(user_statuses([arg for arg in args if not arg.startswith('-')])))
+        return 0
+
+    if command == 'listGroups':
+        print(json.dumps([{'id': GROUP_ID, 'name': 'Fake Group', 'members': []}]))
+        return 0
+
+    print(f'Unknown command: {command}', file=sys.stderr)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
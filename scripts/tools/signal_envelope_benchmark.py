@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Signal Envelope Parsing Benchmark
+
+Replays recorded signal-cli daemon output through the envelope parser and
+compares it with decoding every line into dicts first (the previous approach).
+Receipts and typing indicators dominate busy groups, so the recording mixes
+them in with text, reaction and attachment messages.
+
+The two effects are reported separately: the JSON backend (stdlib json vs the
+orjson/msgspec decoder signal_cli.py picks up) and filtering non-data lines
+before decoding, measured with the same backend on both sides.
+
+Usage:
+    python3 scripts/tools/signal_envelope_benchmark.py
+    python3 scripts/tools/signal_envelope_benchmark.py --input daemon.jsonl --lines 200000
+"""
+
+import argparse
+import importlib.util
+import json
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+SIGNAL_CLI_PATH = project_root / 'modern-stack' / 'src' / 'lib' / 'signal-cli' / 'signal_cli.py'
+DEFAULT_INPUT = Path(__file__).parent / 'fixtures' / 'signal_daemon_output.jsonl'
+
+
+def load_signal_cli():
+    """Load signal_cli.py from the Next.js tree by path."""
+    spec = importlib.util.spec_from_file_location('signal_cli', SIGNAL_CLI_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['signal_cli'] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def decode_all(loads, decode_errors, signal_cli, lines):
+    """Decode every line into dicts with loads, then build messages from data envelopes."""
+    messages = []
+    for line in lines:
+        try:
+            data = loads(line)
+        except decode_errors:
+            continue
+        envelope = data.get('envelope')
+        if envelope and 'dataMessage' in envelope:
+            msg = signal_cli.message_from_envelope(envelope)
+            if msg:
+                messages.append(msg)
+    return messages
+
+
+def parse_full_decode_stdlib(signal_cli, lines):
+    """Decode every line with the stdlib json module (the previous approach)."""
+    return decode_all(json.loads, (ValueError,), signal_cli, lines)
+
+
+def parse_full_decode(signal_cli, lines):
+    """Decode every line with the JSON backend the fast path uses."""
+    return decode_all(signal_cli._json_loads, signal_cli._JSON_DECODE_ERRORS, signal_cli, lines)
+
+
+def parse_fast_path(signal_cli, lines):
+    """Filter non-data lines before decoding and build messages directly."""
+    messages = []
+    for line in lines:
+        msg = signal_cli.parse_envelope_line(line)
+        if msg:
+            messages.append(msg)
+    return messages
+
+
+def time_parser(parser, signal_cli, lines, rounds):
+    """Return the best wall time of several rounds, plus the parsed messages."""
+    best = float('inf')
+    messages = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        messages = parser(signal_cli, lines)
+        best = min(best, time.perf_counter() - started)
+    return best, messages
+
+
+def main():
+    """Main function with command-line interface."""
+    parser = argparse.ArgumentParser(description="Signal envelope parsing benchmark")
+    parser.add_argument('--input', type=Path, default=DEFAULT_INPUT,
+                        help='Recorded signal-cli daemon output, one JSON envelope per line')
+    parser.add_argument('--lines', type=int, default=100000,
+                        help='Number of lines to parse, cycling through the recording (default: 100000)')
+    parser.add_argument('--rounds', type=int, default=3, help='Timed rounds per parser (default: 3)')
+    args = parser.parse_args()
+
+    signal_cli = load_signal_cli()
+    recording = [line for line in args.input.read_text(encoding='utf-8').splitlines() if line.strip()]
+    if not recording:
+        print(f"No envelopes found in {args.input}")
+        return 1
+    lines = [recording[i % len(recording)] for i in range(args.lines)]
+
+    stdlib_time, stdlib_messages = time_parser(parse_full_decode_stdlib, signal_cli, lines, args.rounds)
+    full_time, full_messages = time_parser(parse_full_decode, signal_cli, lines, args.rounds)
+    fast_time, fast_messages = time_parser(parse_fast_path, signal_cli, lines, args.rounds)
+
+    if not stdlib_messages == full_messages == fast_messages:
+        print("Parsers disagree on the decoded messages")
+        return 1
+
+    timings = [
+        ('Full decode (json):', stdlib_time),
+        (f'Full decode ({signal_cli.JSON_BACKEND}):', full_time),
+        ('Fast path:', fast_time),
+    ]
+    rows = [
+        ('Recording:', f"{args.input} ({len(recording)} envelopes)"),
+        ('JSON backend:', signal_cli.JSON_BACKEND),
+        ('Lines parsed:', f"{len(lines)} ({len(fast_messages)} data messages)"),
+        *((label, f"{elapsed:.3f}s  {elapsed / len(lines) * 1e6:.2f} us/line") for label, elapsed in timings),
+        ('Backend speedup:', f"{stdlib_time / full_time:.1f}x"),
+        ('Filtering speedup:', f"{full_time / fast_time:.1f}x"),
+        ('Total speedup:', f"{stdlib_time / fast_time:.1f}x"),
+    ]
+    width = max(len(label) for label, _ in rows) + 1
+    for label, value in rows:
+        print(f"{label:<{width}}{value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Signal Bot Load Test
+
+Drives SignalBot against the fake signal-cli (scripts/tools/fake_signal_cli.py)
+and measures end-to-end command latency, throughput and memory. Latency runs
+from the moment the fake daemon emits an envelope until the bot's reply has
+been handed to signal-cli, so it covers the pipe, parser, router, dispatcher
+and outbound send.
+
+The fake locks the account like signal-cli does, so a bot that runs a second
+signal-cli process next to its receiver shows up as stalled or failed sends.
+
+Usage:
+    python3 scripts/tools/signal_load_test.py                         # 2000 messages, as fast as possible
+    python3 scripts/tools/signal_load_test.py --messages 10000 --rate 200 --senders 500
+    python3 scripts/tools/signal_load_test.py --json-rpc --latency-ms 20 --error-rate 0.01
+    python3 scripts/tools/signal_load_test.py --json > before.json    # Machine-readable report
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+SIGNAL_CLI_PATH = project_root / 'modern-stack' / 'src' / 'lib' / 'signal-cli' / 'signal_cli.py'
+FAKE_SIGNAL_CLI = Path(__file__).parent / 'fake_signal_cli.py'
+
+BOT_NUMBER = '+15559990000'
+
+
+def load_signal_cli():
+    """Load signal_cli.py from the Next.js tree by path."""
+    spec = importlib.util.spec_from_file_location('signal_cli', SIGNAL_CLI_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['signal_cli'] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_load_test(messages=2000, rate=0.0, senders=100, workers=8, latency_ms=0.0, error_rate=0.0,
+                  noise=0, json_rpc=False, handler_timeout=60.0, stall_timeout=10.0, trace_memory=False):
+    """
+    Run one load test and return its report.
+
+    The bot is stopped once every message has been answered, or once no command
+    has completed for stall_timeout seconds.
+
+    Returns:
+        Dict with counts, throughput, latency percentiles and memory usage
+    """
+    signal_cli = load_signal_cli()
+    logging.getLogger('signal_cli').setLevel(logging.WARNING)
+    lock_dir = tempfile.TemporaryDirectory(prefix='fake-signal-cli-')
+
+    os.environ.update({
+        'FAKE_SIGNAL_MESSAGES': str(messages),
+        'FAKE_SIGNAL_RATE': str(rate),
+        'FAKE_SIGNAL_SENDERS': str(senders),
+        'FAKE_SIGNAL_COMMANDS': '!load {seq}',
+        'FAKE_SIGNAL_NOISE': str(noise),
+        'FAKE_SIGNAL_LATENCY_MS': str(latency_ms),
+        'FAKE_SIGNAL_ERROR_RATE': str(error_rate),
+        'FAKE_SIGNAL_LINGER': '0',
+        'FAKE_SIGNAL_LOCK_DIR': lock_dir.name,
+    })
+    os.environ.pop('FAKE_SIGNAL_SCRIPT', None)
+
+    if trace_memory:
+        tracemalloc.start()
+
+    # Unsupervised, so a receiver that exits ends the run instead of being restarted
+    bot = signal_cli.SignalBot(BOT_NUMBER, max_workers=workers, handler_timeout=handler_timeout,
+                               signal_cli_path=str(FAKE_SIGNAL_CLI), use_json_rpc=json_rpc, supervise=False)
+    bot.dispatcher.max_pending = max(bot.dispatcher.max_pending, messages)
+
+    latencies = []
+    failed_sends = []
+    lock = threading.Lock()
+    finished = threading.Event()
+
+    def load_command(bot, message, args):
+        """Acknowledge a load-test message and record its latency."""
+        sent = bot.signal.send_message(message.source_number, f"ack {args}")
+        elapsed_ms = time.time() * 1000 - message.timestamp
+        with lock:
+            latencies.append(elapsed_ms)
+            if not sent:
+                failed_sends.append(args)
+            if len(latencies) == messages:
+                finished.set()
+
+    bot.register_command('!load', load_command)
+
+    bot_thread = threading.Thread(target=bot.start, name='signal-load-bot', daemon=True)
+    started = last_progress = time.monotonic()
+    handled = 0
+    bot_thread.start()
+    while not finished.wait(0.2) and bot_thread.is_alive():
+        with lock:
+            count = len(latencies)
+        if count != handled:
+            handled, last_progress = count, time.monotonic()
+        elif time.monotonic() - last_progress > stall_timeout:
+            logging.warning(f"No command completed for {stall_timeout}s, stopping the load test")
+            break
+    elapsed = time.monotonic() - started
+    bot.running = False
+    bot_thread.join()
+    lock_dir.cleanup()
+
+    traced_peak = None
+    if trace_memory:
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    latencies.sort()
+    metrics = bot.dispatcher.metrics()
+    return {
+        'config': {'messages': messages, 'rate': rate, 'senders': senders, 'workers': workers,
+                   'latency_ms': latency_ms, 'error_rate': error_rate, 'noise': noise, 'json_rpc': json_rpc},
+        'handled': len(latencies),
+        'failed_sends': len(failed_sends),
+        'dropped': messages - len(latencies),
+        'elapsed_s': round(elapsed, 3),
+        'throughput_per_min': round(len(latencies) / elapsed * 60, 1) if elapsed else 0.0,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50), 2),
+            'p95': round(percentile(latencies, 0.95), 2),
+            'p99': round(percentile(latencies, 0.99), 2),
+            'max': round(latencies[-1], 2) if latencies else 0.0,
+        },
+        # ru_maxrss is reported in kilobytes on Linux
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'traced_peak_mb': round(traced_peak / 1024 / 1024, 2) if traced_peak is not None else None,
+        'commands': {name: {'count': stats.count, 'errors': stats.errors, 'timeouts': stats.timeouts,
+                            'avg_ms': round(stats.avg_seconds * 1000, 2), 'max_ms': round(stats.max_seconds * 1000, 2)}
+                     for name, stats in metrics.items()},
+    }
+
+
+def print_report(report):
+    """Print a human-readable summary."""
+    config = report['config']
+    print("===== Signal Bot Load Test =====")
+    print(f"Messages:     {config['messages']} from {config['senders']} senders "
+          f"({'unthrottled' if not config['rate'] else str(config['rate']) + '/s'}, noise {config['noise']})")
+    print(f"Transport:    {'JSON-RPC session' if config['json_rpc'] else 'daemon and subprocess per send'}, "
+          f"{config['workers']} workers, {config['latency_ms']}ms simulated latency")
+    print(f"Handled:      {report['handled']} (dropped {report['dropped']}, failed sends {report['failed_sends']})")
+    print(f"Elapsed:      {report['elapsed_s']}s")
+    print(f"Throughput:   {report['throughput_per_min']} commands/min")
+    latency = report['latency_ms']
+    print(f"Latency (ms): p50 {latency['p50']}  p95 {latency['p95']}  p99 {latency['p99']}  max {latency['max']}")
+    print(f"Peak RSS:     {report['peak_rss_mb']} MB")
+    if report['traced_peak_mb'] is not None:
+        print(f"Traced peak:  {report['traced_peak_mb']} MB")
+
+
+def main():
+    """Main function with command-line interface."""
+    parser = argparse.ArgumentParser(description="Load test SignalBot against a fake signal-cli")
+    parser.add_argument('--messages', type=int, default=2000, help='Data messages to send (default: 2000)')
+    parser.add_argument('--rate', type=float, default=0.0, help='Messages per second, 0 for unthrottled (default: 0)')
+    parser.add_argument('--senders', type=int, default=100, help='Distinct senders (default: 100)')
+    parser.add_argument('--workers', type=int, default=8, help='Bot command workers (default: 8)')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Simulated signal-cli latency per call')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Probability that a signal-cli call fails')
+    parser.add_argument('--noise', type=int, default=0, help='Receipt/typing envelopes per data message')
+    parser.add_argument('--json-rpc', action='store_true',
+                        help='Receive and reply over one persistent JSON-RPC session')
+    parser.add_argument('--stall-timeout', type=float, default=10.0,
+                        help='Stop after this many seconds without a completed command (default: 10)')
+    parser.add_argument('--trace-memory', action='store_true', help='Also report tracemalloc peak (slower)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    report = run_load_test(messages=args.messages, rate=args.rate, senders=args.senders, workers=args.workers,
+                           latency_ms=args.latency_ms, error_rate=args.error_rate, noise=args.noise,
+                           json_rpc=args.json_rpc, stall_timeout=args.stall_timeout,
+                           trace_memory=args.trace_memory)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0 if report['dropped'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
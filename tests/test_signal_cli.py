@@ -0,0 +1,740 @@
+import importlib.util
+import json
+import os
+import stat
+import sys
+import textwrap
+import threading
+import time
+
+import pytest
+
+SIGNAL_CLI_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'modern-stack', 'src', 'lib', 'signal-cli', 'signal_cli.py'
+)
+
+# signal_cli.py lives in the Next.js tree, so load it by path
+_spec = importlib.util.spec_from_file_location('signal_cli', SIGNAL_CLI_PATH)
+signal_cli = importlib.util.module_from_spec(_spec)
+sys.modules['signal_cli'] = signal_cli
+_spec.loader.exec_module(signal_cli)
+
+FAKE_JSON_RPC = """
+import json
+import sys
+
+for line in sys.stdin:
+    request = json.loads(line)
+    method = request["method"]
+    if method == "listGroups":
+        result = [{"id": "group1", "name": "Test Group"}]
+    elif method == "send":
+        recipients = request["params"].get("recipient", [])
+        result = {"timestamp": 1, "results": [
+            {"recipientAddress": {"number": number},
+             "type": "UNREGISTERED_FAILURE" if number.endswith("9999") else "SUCCESS"}
+            for number in recipients
+        ]}
+    elif method == "getUserStatus":
+        result = [{"number": number, "uuid": "uuid-" + number[-4:], "isRegistered": not number.endswith("0404")}
+                  for number in request["params"]["recipient"]]
+    elif method == "subscribeReceive":
+        # Like signal-cli in manual receive mode, push messages once subscribed
+        print(json.dumps({"jsonrpc": "2.0", "method": "receive", "params": {"subscription": 0, "result": {
+            "envelope": {"timestamp": 2, "sourceNumber": "+15550000001", "source": "+15550000001",
+                         "dataMessage": {"message": "hello"}}}}}), flush=True)
+        result = 0
+    elif method == "unsubscribeReceive":
+        result = True
+    elif method == "fail":
+        print(json.dumps({"jsonrpc": "2.0", "id": request["id"],
+                          "error": {"code": -32601, "message": "Method not implemented"}}), flush=True)
+        continue
+    else:
+        continue
+    print(json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": result}), flush=True)
+"""
+
+
+def write_fake_cli(tmp_path, body, name='fake-signal-cli'):
+    """Write an executable stand-in for signal-cli"""
+    path = tmp_path / name
+    path.write_text(f"#!{sys.executable}\n" + textwrap.dedent(body))
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+@pytest.fixture
+def rpc_cli(tmp_path):
+    """SignalCLI wired to a fake JSON-RPC signal-cli"""
+    cli = signal_cli.SignalCLI('+15550000000', write_fake_cli(tmp_path, FAKE_JSON_RPC), use_json_rpc=True)
+    yield cli
+    cli.stop_session()
+
+
+def test_json_rpc_session_reuses_one_process(rpc_cli):
+    """Multiple commands share a single signal-cli process"""
+    assert rpc_cli.list_groups() == [{"id": "group1", "name": "Test Group"}]
+    process = rpc_cli.rpc_session.process
+    assert rpc_cli.send_message('+15550000001', 'hi')
+    assert rpc_cli.send_group_message('group1', 'hi all')
+    assert rpc_cli.rpc_session.process is process
+
+
+def test_json_rpc_multiplexes_concurrent_requests(rpc_cli):
+    """Responses are matched to requests by id"""
+    rpc_cli.start_session()
+    futures = [rpc_cli.rpc_session.submit('getUserStatus', {'recipient': [f'+1555000{i:04d}']}) for i in range(20)]
+    results = [future.result(timeout=5) for future in futures]
+    assert [result[0]['number'] for result in results] == [f'+1555000{i:04d}' for i in range(20)]
+
+
+def test_json_rpc_error_raises(rpc_cli):
+    """JSON-RPC errors surface as SignalRPCError"""
+    rpc_cli.start_session()
+    with pytest.raises(signal_cli.SignalRPCError) as excinfo:
+        rpc_cli.rpc_session.request('fail')
+    assert excinfo.value.code == -32601
+
+
+def test_json_rpc_receive_notifications(rpc_cli):
+    """Messages pushed by the session are returned by receive_messages"""
+    assert rpc_cli.send_message('+15550000001', 'hi')
+    messages = rpc_cli.receive_messages(timeout=2)
+    assert [msg.message for msg in messages] == ['hello']
+    assert rpc_cli.daemon_process is None
+
+
+def test_json_rpc_receiving_shares_the_session_process(rpc_cli):
+    """Continuous receiving subscribes the session instead of starting a daemon"""
+    assert rpc_cli.start_daemon()
+    process = rpc_cli.rpc_session.process
+    assert rpc_cli.daemon_process is process
+    assert rpc_cli.next_daemon_message(timeout=5).message == 'hello'
+    assert rpc_cli.send_message('+15550000001', 'hi')
+    assert rpc_cli.daemon_running and rpc_cli.rpc_session.process is process
+    rpc_cli.stop_daemon()
+    assert not rpc_cli.daemon_running and rpc_cli.rpc_session.is_running
+
+
+def test_json_rpc_session_exit_fails_pending(tmp_path):
+    """Pending requests fail when signal-cli exits"""
+    cli = signal_cli.SignalCLI('+15550000000', write_fake_cli(tmp_path, "import sys\nsys.stdin.readline()\n"),
+                               use_json_rpc=True)
+    assert cli.start_session()
+    with pytest.raises(signal_cli.SignalRPCError):
+        cli.rpc_session.request('listGroups', timeout=5)
+    cli.stop_session()
+
+
+FAKE_DAEMON = """
+import json
+import os
+import sys
+import time
+
+# Enough stderr output to fill an undrained pipe
+sys.stderr.write("x" * 200000 + "\\n")
+sys.stderr.flush()
+for i in range(3):
+    print(json.dumps({"envelope": {"timestamp": i, "sourceNumber": "+15550000001",
+                                   "dataMessage": {"message": f"!ping {i}"}}}), flush=True)
+    print(json.dumps({"envelope": {"timestamp": i, "typingMessage": {"action": "STARTED"}}}), flush=True)
+time.sleep(float(os.environ.get("FAKE_DAEMON_LINGER", "0")))
+"""
+
+
+@pytest.fixture
+def daemon_cli(tmp_path):
+    """SignalCLI wired to a fake daemon that emits three data messages"""
+    cli = signal_cli.SignalCLI('+15550000000', write_fake_cli(tmp_path, FAKE_DAEMON))
+    yield cli
+    cli.stop_daemon()
+
+
+def test_daemon_messages_dispatched_as_they_arrive(daemon_cli, monkeypatch):
+    """Messages are available without polling and stderr does not block the daemon"""
+    monkeypatch.setenv('FAKE_DAEMON_LINGER', '5')
+    assert daemon_cli.start_daemon()
+    received = [daemon_cli.next_daemon_message(timeout=5) for _ in range(3)]
+    assert [msg.message for msg in received] == ['!ping 0', '!ping 1', '!ping 2']
+    # Typing envelopes are filtered out and nothing else is pending
+    assert daemon_cli.read_daemon_messages() == []
+    assert daemon_cli.daemon_running
+
+
+def test_daemon_queue_applies_backpressure(tmp_path):
+    """The reader never buffers more than daemon_queue_size messages"""
+    cli = signal_cli.SignalCLI('+15550000000', write_fake_cli(tmp_path, FAKE_DAEMON), daemon_queue_size=2)
+    assert cli.start_daemon()
+    try:
+        first = cli.next_daemon_message(timeout=5)
+        assert first is not None
+        assert cli._daemon_messages.qsize() <= 2
+    finally:
+        cli.stop_daemon()
+
+
+def test_bot_stops_when_daemon_exits(daemon_cli):
+    """An unsupervised SignalBot handles queued messages then stops once the daemon output ends"""
+    bot = signal_cli.SignalBot('+15550000000', supervise=False)
+    bot.signal = daemon_cli
+    handled = []
+    bot._handle_message = handled.append
+    bot.start()
+    assert [msg.message for msg in handled] == ['!ping 0', '!ping 1', '!ping 2']
+    assert not bot.running
+
+
+def make_message(text, sender='+15550000001'):
+    """Build a SignalMessage from a sender"""
+    return signal_cli.SignalMessage(
+        timestamp=0, source=sender, source_number=sender, source_uuid='', source_name=None, message=text
+    )
+
+
+@pytest.fixture
+def dispatch_bot():
+    """SignalBot whose outbound sends are recorded instead of sent"""
+    bot = signal_cli.SignalBot('+15550000000', max_workers=4, handler_timeout=0.5)
+    bot.sent = []
+    bot.signal.send_message = lambda recipient, text, attachments=None: bot.sent.append((recipient, text)) or True
+    yield bot
+    bot.dispatcher.shutdown(wait=False)
+
+
+def test_dispatcher_slow_sender_does_not_block_others(dispatch_bot):
+    """A slow handler for one sender leaves other senders responsive"""
+    release = threading.Event()
+    dispatch_bot.register_command('!slow', lambda bot, message, args: release.wait(2))
+    dispatch_bot._handle_message(make_message('!slow', '+15550000001'))
+    dispatch_bot._handle_message(make_message('!ping', '+15550000002'))
+    assert dispatch_bot.dispatcher.wait_idle(timeout=0.3) is False
+    assert ('+15550000002', '🏓 Pong!') in dispatch_bot.sent
+    release.set()
+    assert dispatch_bot.dispatcher.wait_idle(timeout=2)
+
+
+def test_dispatcher_preserves_per_sender_order(dispatch_bot):
+    """Commands from one sender run in the order they arrived"""
+    seen = []
+
+    def record(bot, message, args):
+        time.sleep(0.01 * (5 - int(args)))
+        seen.append(int(args))
+
+    dispatch_bot.register_command('!rec', record)
+    for i in range(5):
+        dispatch_bot._handle_message(make_message(f'!rec {i}'))
+    assert dispatch_bot.dispatcher.wait_idle(timeout=2)
+    assert seen == [0, 1, 2, 3, 4]
+
+
+def test_dispatcher_timeout_and_metrics(dispatch_bot):
+    """Slow handlers are reported and latency is tracked per command"""
+    dispatch_bot.register_command('!stuck', lambda bot, message, args: time.sleep(1))
+    dispatch_bot.register_command('!boom', lambda bot, message, args: 1 / 0)
+    dispatch_bot._handle_message(make_message('!stuck'))
+    dispatch_bot._handle_message(make_message('!ping'))
+    dispatch_bot._handle_message(make_message('!boom', '+15550000003'))
+    assert dispatch_bot.dispatcher.wait_idle(timeout=2)
+    metrics = dispatch_bot.dispatcher.metrics()
+    assert metrics['!stuck'].timeouts == 1
+    assert metrics['!ping'].count == 1
+    assert metrics['!boom'].errors == 1
+    assert any('taking longer' in text for _, text in dispatch_bot.sent)
+    assert any(text.startswith('Error processing command') for _, text in dispatch_bot.sent)
+
+
+def test_dispatcher_timeout_starts_when_handler_runs():
+    """Jobs waiting for a free worker are neither timed out nor charged for the wait"""
+    dispatcher = signal_cli.CommandDispatcher(max_workers=1, handler_timeout=0.3)
+    runs = []
+    timeouts = []
+    try:
+        for sender in ('+15550000001', '+15550000002', '+15550000003'):
+            for i in range(2):
+                dispatcher.submit(sender, '!work', lambda s=sender, i=i: runs.append((s, i)) or time.sleep(0.1),
+                                  on_timeout=lambda s=sender: timeouts.append(s))
+        assert dispatcher.wait_idle(timeout=5)
+    finally:
+        dispatcher.shutdown(wait=False)
+    assert len(runs) == 6 and timeouts == []
+    for sender in ('+15550000001', '+15550000002', '+15550000003'):
+        assert [i for s, i in runs if s == sender] == [0, 1]
+    stats = dispatcher.metrics()['!work']
+    assert stats.timeouts == 0 and stats.max_seconds < 0.3
+
+
+def test_dispatcher_timed_out_job_stays_pending_until_it_returns():
+    """wait_idle() does not report idle while a timed-out handler is still running"""
+    dispatcher = signal_cli.CommandDispatcher(max_workers=2, handler_timeout=0.1)
+    release = threading.Event()
+    try:
+        dispatcher.submit('+15550000001', '!slow', lambda: release.wait(2))
+        assert dispatcher.wait_idle(timeout=0.4) is False
+        assert dispatcher.metrics()['!slow'].timeouts == 1
+        release.set()
+        assert dispatcher.wait_idle(timeout=2)
+    finally:
+        dispatcher.shutdown(wait=False)
+    assert dispatcher.metrics()['!slow'].count == 1
+
+
+def test_broadcast_batches_recipients_over_session(rpc_cli):
+    """Recipients are grouped into multi-recipient sends with per-recipient results"""
+    rpc_cli.start_session()
+    sends = []
+    submit = rpc_cli.rpc_session.submit
+
+    def record_submit(method, params=None):
+        sends.append(params)
+        return submit(method, params)
+
+    rpc_cli.rpc_session.submit = record_submit
+    recipients = [f'+1555000{i:04d}' for i in range(120)] + ['+15559999999']
+    results = rpc_cli.broadcast(
+        'announcement', recipients=recipients + recipients[:5], group_ids=['group1', 'group2'],
+        batch_size=50, rate_limiter=signal_cli.RateLimiter(rate=10000)
+    )
+    assert [len(send.get('recipient', [])) for send in sends] == [50, 50, 21, 0, 0]
+    assert [send.get('groupId') for send in sends[3:]] == ['group1', 'group2']
+    assert len(results) == 123
+    assert results['+15559999999'].success is False
+    assert results['+15559999999'].error == 'UNREGISTERED_FAILURE'
+    assert all(result.success for key, result in results.items() if key != '+15559999999')
+
+
+def test_broadcast_subprocess_reports_each_recipient(tmp_path):
+    """Without a session each batch is one signal-cli invocation with per-recipient results"""
+    log = tmp_path / 'calls.log'
+    cli_path = write_fake_cli(tmp_path, f"""
+import json
+import sys
+with open({str(log)!r}, "a") as f:
+    f.write(" ".join(sys.argv[1:]) + "\\n")
+assert sys.argv[3:5] == ["-o", "json"]
+recipients = sys.argv[sys.argv.index("-m") + 2:]
+if "+15550000004" in recipients:
+    sys.stderr.write("Failed to send message\\n")
+    sys.exit(2)
+failed = [number for number in recipients if number.endswith("3")]
+print(json.dumps({{"timestamp": 1, "results": [
+    {{"recipientAddress": {{"number": number}},
+      "type": "UNREGISTERED_FAILURE" if number in failed else "SUCCESS"}}
+    for number in recipients
+]}}))
+sys.exit(1 if failed else 0)
+""")
+    cli = signal_cli.SignalCLI('+15550000000', cli_path)
+    recipients = ['+15550000001', '+15550000002', '+15550000003', '+15550000004']
+    results = cli.broadcast('hi', recipients=recipients, batch_size=3, rate_limiter=signal_cli.RateLimiter(rate=10000))
+    assert len(log.read_text().splitlines()) == 2
+    assert results['+15550000001'].success and results['+15550000002'].success
+    assert results['+15550000003'].error == 'UNREGISTERED_FAILURE'
+    assert results['+15550000004'].success is False
+    assert results['+15550000004'].error == 'Failed to send message'
+
+
+def test_rate_limiter_spaces_out_sends():
+    """Acquiring beyond the burst waits for the bucket to refill"""
+    limiter = signal_cli.RateLimiter(rate=100, burst=10)
+    started = time.monotonic()
+    limiter.acquire(10)
+    limiter.acquire(10)
+    assert time.monotonic() - started >= 0.09
+
+
+def test_identity_cache_serves_repeat_lookups(rpc_cli):
+    """Each number is looked up once per TTL, misses are batched into one call"""
+    rpc_cli.start_session()
+    calls = []
+    request = rpc_cli.rpc_session.request
+
+    def record_request(method, params=None, timeout=None):
+        calls.append(list(params['recipient']))
+        return request(method, params, timeout)
+
+    rpc_cli.rpc_session.request = record_request
+    assert rpc_cli.get_user_status('+15550000001')['uuid'] == 'uuid-0001'
+    assert rpc_cli.get_user_status('+15550000001')['uuid'] == 'uuid-0001'
+    statuses = rpc_cli.get_user_statuses(['+15550000001', '+15550000002', '+15550000404'])
+    assert statuses['+15550000002']['uuid'] == 'uuid-0002'
+    assert statuses['+15550000404']['isRegistered'] is False
+    # Negative results are cached as well
+    rpc_cli.get_user_status('+15550000404')
+    assert calls == [['+15550000001'], ['+15550000002', '+15550000404']]
+
+
+def test_user_status_matches_unnormalized_input(tmp_path):
+    """Statuses are matched on the echoed recipient when signal-cli normalizes the number"""
+    cli = signal_cli.SignalCLI('+15550000000', write_fake_cli(tmp_path, """
+import json
+import sys
+numbers = [arg for arg in sys.argv[4:] if not arg.startswith("-")]
+print(json.dumps([{"recipient": number, "number": "+" + number.lstrip("+"), "uuid": "uuid-" + number[-4:],
+                   "isRegistered": True} for number in numbers]))
+"""))
+    assert cli.get_user_status('15551234567')['uuid'] == 'uuid-4567'
+    assert cli.identity_cache.get('15551234567')[1]['number'] == '+15551234567'
+
+
+def test_identity_cache_ttl_and_lru():
+    """Entries expire after their TTL and least recently used entries are evicted"""
+    cache = signal_cli.IdentityCache(ttl=60, negative_ttl=0, max_size=2)
+    cache.set('+1', {'isRegistered': True})
+    cache.set('+2', {'isRegistered': True})
+    cache.get('+1')
+    cache.set('+3', {'isRegistered': True})
+    assert cache.get('+1')[0] and not cache.get('+2')[0]
+    cache.set('+4', None)
+    assert cache.get('+4') == (False, None)
+
+
+def test_identity_store_persists_resolved_uuid(rpc_cli):
+    """Resolved UUIDs are written to users.signal_identity"""
+    executed = []
+
+    class Cursor:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def execute(self, sql, params):
+            executed.append((sql, params))
+
+    class Connection:
+        def cursor(self):
+            return Cursor()
+
+        def commit(self):
+            pass
+
+    rpc_cli.identity_store = signal_cli.UserIdentityStore(Connection())
+    rpc_cli.get_user_statuses(['+15550000001', '+15550000404'])
+    assert executed == [("UPDATE users SET signal_identity = %s WHERE signal_identity = %s",
+                         ('uuid-0001', '+15550000001'))]
+
+
+RECORDED_DAEMON_OUTPUT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'scripts', 'tools', 'fixtures', 'signal_daemon_output.jsonl'
+)
+
+
+def test_parse_envelope_line_skips_non_data_envelopes(monkeypatch):
+    """Receipts, typing and sync envelopes are rejected without a full decode"""
+    decoded = []
+    loads = signal_cli._json_loads
+    monkeypatch.setattr(signal_cli, '_json_loads', lambda line: decoded.append(line) or loads(line))
+    with open(RECORDED_DAEMON_OUTPUT, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    messages = [msg for msg in map(signal_cli.parse_envelope_line, lines) if msg]
+    assert len(decoded) == len(messages) == 5
+    assert [msg.message_type for msg in messages] == [
+        signal_cli.SignalMessageType.TEXT,
+        signal_cli.SignalMessageType.REACTION,
+        signal_cli.SignalMessageType.TEXT,
+        signal_cli.SignalMessageType.ATTACHMENT,
+        signal_cli.SignalMessageType.TEXT,
+    ]
+    assert messages[0].group_id == 'aGVsbG8gd29ybGQgZ3JvdXAgaWQ='
+    assert messages[1].message == ''
+    assert messages[2].message == '!help' and messages[2].source_name == 'Riley'
+
+
+def test_parse_envelope_line_handles_json_rpc_notifications():
+    """JSON-RPC receive notifications parse like daemon output"""
+    line = json.dumps({"jsonrpc": "2.0", "method": "receive", "params": {"envelope": {
+        "sourceNumber": "+15550000001", "timestamp": 5, "dataMessage": {"message": "!ping"}}}})
+    msg = signal_cli.parse_envelope_line(line)
+    assert msg.message == '!ping' and msg.source_number == '+15550000001'
+    assert signal_cli.parse_envelope_line('{"dataMessage": ') is None
+
+
+def test_signal_message_uses_slots():
+    """SignalMessage instances carry no per-instance dict"""
+    assert not hasattr(make_message('!ping'), '__dict__')
+
+
+def test_router_exact_prefix_alias_and_subcommands():
+    """Routes resolve by exact name, alias, unique prefix and subcommand"""
+    router = signal_cli.CommandRouter()
+    ping = router.add('!ping', lambda *a: None)
+    router.add('!pin', lambda *a: None)
+    info = router.add('!info', lambda *a: None, aliases=('!whoami',))
+    group_list = router.add('!group list', lambda *a: None, aliases=('ls',))
+    group = router.add('!group', lambda *a: None)
+
+    assert router.route('!ping hello') == (ping, 'hello')
+    assert router.route('!WHOAMI') == (info, '')
+    assert router.route('!inf') == (info, '')
+    # '!pi' is shared by '!ping' and '!pin'
+    assert router.route('!pi') is None
+    assert router.route('!group ls mine') == (group_list, 'mine')
+    assert router.route('!gr list') == (group_list, '')
+    assert router.route('!group members') == (group, 'members')
+    assert router.route('!nope') is None
+    assert router.route('!') is None
+
+
+def test_router_reregistering_drops_old_aliases():
+    """Replacing a command removes the aliases of the route it replaced"""
+    router = signal_cli.CommandRouter()
+    router.add('!info', lambda *a: 'old', aliases=('!whoami',))
+    new = router.add('!info', lambda *a: 'new')
+    assert router.route('!whoami') is None
+    assert router.route('!who') is None
+    assert router.route('!info') == (new, '')
+    assert router.route('!i') == (new, '')
+    assert router.routes() == [new]
+
+
+def test_router_help_text_is_cached():
+    """Help text is built once and rebuilt after commands change"""
+    router = signal_cli.CommandRouter()
+    router.add('!ping', lambda *a: None, description='Check the bot')
+    help_text = router.help_text
+    assert router.help_text is help_text
+    assert '!ping - Check the bot' in help_text
+    router.add('!group list', lambda *a: None, aliases=('ls',))
+    assert '!group list (ls)' in router.help_text
+
+
+def test_bot_commands_is_a_read_only_view_of_the_router(dispatch_bot):
+    """bot.commands reflects registered routes and cannot be changed behind the router's back"""
+    handler = lambda bot, message, args: None
+    dispatch_bot.register_command('!group list', handler, aliases=('ls',))
+    assert dispatch_bot.commands['!group list'] is handler
+    assert set(dispatch_bot.commands) == {'!help', '!ping', '!group list'}
+    with pytest.raises(TypeError):
+        dispatch_bot.commands['!other'] = handler
+
+
+def test_bot_suppresses_unknown_command_spam(dispatch_bot):
+    """Repeated unknown commands from one sender get a bounded number of replies"""
+    for _ in range(10):
+        dispatch_bot._handle_message(make_message('!bogus'))
+    dispatch_bot._handle_message(make_message('!bogus', '+15550000002'))
+    assert dispatch_bot.dispatcher.wait_idle(timeout=2)
+    replies = [recipient for recipient, text in dispatch_bot.sent if text.startswith('Unknown command')]
+    assert replies.count('+15550000001') == 2
+    assert replies.count('+15550000002') == 1
+
+
+def test_bot_per_command_rate_limit(dispatch_bot):
+    """Commands registered with a rate limit drop excess uses per sender"""
+    calls = []
+    dispatch_bot.register_command('!report', lambda bot, message, args: calls.append(args), rate_limit=3)
+    for i in range(5):
+        dispatch_bot._handle_message(make_message(f'!report {i}'))
+    assert dispatch_bot.dispatcher.wait_idle(timeout=2)
+    assert calls == ['0', '1', '2']
+
+
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts', 'tools')
+FAKE_SIGNAL_CLI = os.path.join(TOOLS_DIR, 'fake_signal_cli.py')
+
+
+def test_fake_signal_cli_stands_in_for_signal_cli(monkeypatch):
+    """SignalCLI works end to end against the fake executable"""
+    monkeypatch.setenv('FAKE_SIGNAL_MESSAGES', '3')
+    monkeypatch.setenv('FAKE_SIGNAL_NOISE', '1')
+    cli = signal_cli.SignalCLI('+15550000000', FAKE_SIGNAL_CLI)
+    assert [msg.message for msg in cli.receive_messages(timeout=1)] == ['!ping'] * 3
+    assert cli.send_message('+15550000001', 'hi')
+    assert cli.get_user_status('+15550000001')['isRegistered'] is True
+    assert cli.list_groups()[0]['name'] == 'Fake Group'
+    monkeypatch.setenv('FAKE_SIGNAL_ERROR_RATE', '1')
+    assert cli.send_message('+15550000001', 'hi') is False
+
+
+def test_load_test_harness_reports_latency_and_throughput():
+    """The load-test harness drives SignalBot through the fake daemon"""
+    spec = importlib.util.spec_from_file_location('signal_load_test', os.path.join(TOOLS_DIR, 'signal_load_test.py'))
+    harness = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(harness)
+    env = dict(os.environ)
+    try:
+        report = harness.run_load_test(messages=100, senders=10, noise=1, json_rpc=True)
+    finally:
+        os.environ.clear()
+        os.environ.update(env)
+    assert report['handled'] == 100 and report['dropped'] == 0
+    assert report['throughput_per_min'] > 0
+    assert report['latency_ms']['p50'] <= report['latency_ms']['p99'] <= report['latency_ms']['max']
+    assert report['commands']['!load']['count'] == 100
+
+
+CRASHING_DAEMON = """
+import fcntl
+import json
+import os
+import sys
+import time
+
+# Like signal-cli, hold an exclusive lock on the account data while running
+lock = open(os.environ["FAKE_DAEMON_LOCK"], "w")
+fcntl.flock(lock, fcntl.LOCK_EX)
+sys.stderr.write(f"daemon {os.getpid()} crashing soon\\n")
+sys.stderr.flush()
+print(json.dumps({"envelope": {"timestamp": 1, "sourceNumber": "+15550000001",
+                               "dataMessage": {"message": f"!ping {os.getpid()}"}}}), flush=True)
+time.sleep(0.2)
+sys.exit(3)
+"""
+
+
+def collect_messages(cli, count, timeout=10):
+    """Wait for count daemon messages"""
+    deadline = time.monotonic() + timeout
+    messages = []
+    while len(messages) < count and time.monotonic() < deadline:
+        msg = cli.next_daemon_message(timeout=0.2)
+        if msg:
+            messages.append(msg)
+    return messages
+
+
+@pytest.fixture
+def crashing_cli(tmp_path, monkeypatch):
+    """SignalCLI whose fake daemon emits one message then crashes"""
+    monkeypatch.setenv('FAKE_DAEMON_LOCK', str(tmp_path / 'account.lock'))
+    cli = signal_cli.SignalCLI('+15550000000', write_fake_cli(tmp_path, CRASHING_DAEMON))
+    yield cli
+    cli.stop_daemon()
+
+
+def test_supervisor_restarts_crashed_daemon(crashing_cli):
+    """A crashed daemon is restarted and messages keep flowing on the same queue"""
+    supervisor = signal_cli.DaemonSupervisor(crashing_cli, initial_backoff=0.01, max_backoff=0.05,
+                                             check_interval=0.05)
+    assert supervisor.start()
+    try:
+        messages = collect_messages(crashing_cli, 3)
+    finally:
+        supervisor.stop()
+    assert len({msg.message for msg in messages}) == 3
+    stats = supervisor.metrics()
+    assert stats.restarts >= 2
+    assert stats.last_exit_code == 3
+    assert stats.total_downtime_seconds > 0
+    assert 'crashing soon' in crashing_cli.daemon_stderr_tail[-1]
+
+
+def test_supervisor_fails_over_to_warm_standby(crashing_cli):
+    """The warm standby waits on the account lock and takes over when the primary exits"""
+    supervisor = signal_cli.DaemonSupervisor(crashing_cli, initial_backoff=1, warm_standby=True,
+                                             check_interval=0.05)
+    # Let the primary take the account lock before the standby starts
+    assert crashing_cli.start_daemon()
+    first = crashing_cli.next_daemon_message(timeout=5)
+    assert first and supervisor.start()
+    try:
+        messages = [first] + collect_messages(crashing_cli, 1)
+    finally:
+        supervisor.stop()
+    assert len({msg.message for msg in messages}) == 2
+    assert supervisor.metrics().failovers >= 1
+
+
+FAILING_STANDBY_DAEMON = """
+import fcntl
+import json
+import os
+import sys
+import time
+
+# Exits at once when another instance holds the account, like a misconfigured standby
+lock = open(os.environ["FAKE_DAEMON_LOCK"], "w")
+try:
+    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+except BlockingIOError:
+    sys.exit(1)
+print(json.dumps({"envelope": {"timestamp": 1, "sourceNumber": "+15550000001",
+                               "dataMessage": {"message": "!ping"}}}), flush=True)
+time.sleep(5)
+"""
+
+
+def test_supervisor_backs_off_failing_standby(tmp_path, monkeypatch):
+    """A standby that keeps exiting is respawned with backoff and counted"""
+    monkeypatch.setenv('FAKE_DAEMON_LOCK', str(tmp_path / 'account.lock'))
+    cli = signal_cli.SignalCLI('+15550000000', write_fake_cli(tmp_path, FAILING_STANDBY_DAEMON))
+    supervisor = signal_cli.DaemonSupervisor(cli, initial_backoff=0.1, max_backoff=0.4, warm_standby=True,
+                                             check_interval=0.02)
+    # Let the primary take the account lock before any standby starts
+    assert cli.start_daemon() and cli.next_daemon_message(timeout=5)
+    assert supervisor.start()
+    try:
+        time.sleep(1.2)
+        failures = supervisor.metrics().standby_failures
+    finally:
+        supervisor.stop()
+        cli.stop_daemon()
+    # Unthrottled, a check every 20ms would have started dozens of standbys
+    assert 2 <= failures <= 6
+    assert supervisor.metrics().restarts == 0
+
+
+HANGING_JSON_RPC = """
+import json
+import os
+import sys
+
+# The first process stops answering, like a hung JVM; later ones respond
+launches = os.environ["FAKE_LAUNCHES"]
+with open(launches, "a") as f:
+    f.write("x")
+hung = os.path.getsize(launches) == 1
+for line in sys.stdin:
+    if not hung:
+        request = json.loads(line)
+        print(json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": {}}), flush=True)
+"""
+
+
+def test_supervisor_restarts_unresponsive_json_rpc_daemon(tmp_path, monkeypatch):
+    """A daemon that is alive but stops answering health probes is restarted"""
+    monkeypatch.setenv('FAKE_LAUNCHES', str(tmp_path / 'launches'))
+    cli = signal_cli.SignalCLI('+15550000000', write_fake_cli(tmp_path, HANGING_JSON_RPC), use_json_rpc=True)
+    supervisor = signal_cli.DaemonSupervisor(cli, initial_backoff=0.01, check_interval=0.02, health_interval=0.05,
+                                             health_timeout=0.1, max_health_failures=2)
+    assert supervisor.start()
+    try:
+        hung = cli.daemon_process
+        deadline = time.monotonic() + 5
+        while supervisor.metrics().restarts == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        # The replacement keeps answering, so no further failures pile up
+        time.sleep(0.5)
+        stats = supervisor.metrics()
+    finally:
+        supervisor.stop()
+        cli.stop_daemon()
+        cli.stop_session()
+    assert hung.returncode is not None
+    assert stats.restarts == 1 and stats.health_check_failures == 2
+
+
+def test_supervised_bot_survives_daemon_crash(crashing_cli):
+    """SignalBot keeps handling commands across daemon restarts"""
+    bot = signal_cli.SignalBot('+15550000000')
+    bot.signal = crashing_cli
+    bot.supervisor = signal_cli.DaemonSupervisor(crashing_cli, initial_backoff=0.01, check_interval=0.05)
+    handled = []
+
+    def handle(message):
+        handled.append(message)
+        if len(handled) == 2:
+            bot.running = False
+
+    bot._handle_message = handle
+    thread = threading.Thread(target=bot.start)
+    thread.start()
+    thread.join(timeout=10)
+    assert len(handled) == 2
+    assert bot.supervisor.metrics().restarts >= 1
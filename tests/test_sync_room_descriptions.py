@@ -0,0 +1,120 @@
+import asyncio
+import importlib.util
+import os
+import sys
+import types
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+SCRIPT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'scripts', 'sync_room_descriptions.py'
+)
+
+
+class MatrixRoom:
+    """Stand-in for app.db.models.MatrixRoom"""
+    room_id = Mock()
+
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+
+@pytest.fixture
+def sync_module():
+    """Load the script with the app modules it imports stubbed out"""
+    models = types.ModuleType('app.db.models')
+    models.MatrixRoom = MatrixRoom
+    stubs = {
+        'app': MagicMock(),
+        'app.utils': MagicMock(),
+        'app.utils.config': MagicMock(),
+        'app.utils.matrix_actions': MagicMock(),
+        'app.db': MagicMock(),
+        'app.db.session': MagicMock(),
+        'app.db.models': models,
+    }
+    if importlib.util.find_spec('sqlalchemy') is None:
+        stubs.update({'sqlalchemy': MagicMock(), 'sqlalchemy.orm': MagicMock()})
+    with patch.dict(sys.modules, stubs):
+        spec = importlib.util.spec_from_file_location('sync_room_descriptions', SCRIPT_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        yield module
+
+
+def make_syncer(sync_module, rows):
+    """Syncer whose database returns the given MatrixRoom rows"""
+    syncer = sync_module.RoomDescriptionSyncer()
+    syncer.db = Mock()
+    syncer.db.query.return_value.filter.return_value.all.return_value = rows
+    return syncer
+
+
+def stored_room(room_id, **values):
+    """MatrixRoom row as it was stored by an earlier sync"""
+    defaults = {'name': 'General', 'display_name': 'General', 'topic': 'Chat',
+                'canonical_alias': '#general:example.org', 'member_count': 42, 'last_synced': None}
+    defaults.update(values)
+    return MatrixRoom(room_id=room_id, **defaults)
+
+
+FETCHED = {'name': 'General', 'topic': 'Chat', 'canonical_alias': '#general:example.org', 'member_count': 42}
+CONFIGURED = {'name': 'General', 'description': 'Configured topic'}
+
+
+def test_failed_fetch_keeps_stored_row(sync_module):
+    """A room whose fetch failed is not overwritten with blank values"""
+    room = stored_room('!a:example.org')
+    syncer = make_syncer(sync_module, [room])
+    stats = syncer.store_all_rooms({'!a:example.org': None}, {'!a:example.org': CONFIGURED})
+    assert stats == {'created': 0, 'updated': 0, 'unchanged': 0, 'failed': 1}
+    assert room.member_count == 42 and room.canonical_alias == '#general:example.org'
+    syncer.db.commit.assert_called_once()
+
+
+def test_failed_fetch_creates_new_room_from_config(sync_module):
+    """A new room is still stored from configured data when its fetch failed"""
+    syncer = make_syncer(sync_module, [])
+    stats = syncer.store_all_rooms({'!b:example.org': None}, {'!b:example.org': CONFIGURED})
+    assert stats['created'] == 1
+    created = syncer.db.add.call_args[0][0]
+    assert created.display_name == 'General' and created.topic == 'Configured topic'
+
+
+def test_unchanged_rooms_are_skipped(sync_module):
+    """Unchanged rooms only bump last_synced, or are left alone with skip_unchanged"""
+    unchanged, changed = stored_room('!a:example.org'), stored_room('!c:example.org', member_count=40)
+    syncer = make_syncer(sync_module, [unchanged, changed])
+    room_infos = {'!a:example.org': dict(FETCHED), '!c:example.org': dict(FETCHED)}
+    configured = {'!a:example.org': CONFIGURED, '!c:example.org': CONFIGURED}
+
+    stats = syncer.store_all_rooms(room_infos, configured, skip_unchanged=True)
+    assert stats == {'created': 0, 'updated': 1, 'unchanged': 1, 'failed': 0}
+    assert unchanged.last_synced is None
+    assert changed.member_count == 42 and changed.last_synced is not None
+
+    syncer.store_all_rooms(room_infos, configured)
+    assert unchanged.last_synced is not None
+    syncer.db.add.assert_not_called()
+
+
+def test_fetch_all_rooms_respects_concurrency(sync_module):
+    """No more than the configured number of rooms are fetched at once"""
+    syncer = sync_module.RoomDescriptionSyncer(concurrency=2)
+    active, peak = 0, 0
+
+    async def fetch_room_info(room_id):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return {'name': room_id}
+
+    syncer.fetch_room_info = fetch_room_info
+    room_ids = [f'!{i}:example.org' for i in range(6)]
+    results = asyncio.run(syncer.fetch_all_rooms(room_ids))
+    assert list(results) == room_ids
+    assert peak == 2